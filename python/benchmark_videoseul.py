@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de performance pour videoseul.py
+Résultats affichés en console et enregistrés en JSON pour comparer les exécutions
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Corpus français fixe pour comparer les moteurs de synthèse entre eux
+TTS_CORPUS = [
+    "Bonjour et bienvenue dans cette formation.",
+    "Le module de facturation permet de générer les factures clients à partir des contrats actifs.",
+    "Avant de valider une prestation, vérifiez que le paramétrage du barème est complet "
+    "et que la date d'effet correspond bien à la période de facturation.",
+    "Chaque dossier passe successivement par les états : saisie, contrôle, validation et archivage.",
+    "Merci pour votre attention.",
+]
+
+def benchmark_tts(backend_names, repeat=3):
+    """Mesure le facteur temps réel et la latence du premier audio de chaque moteur TTS"""
+    import videoseul
+
+    results = []
+    for name in backend_names:
+        print(f"\n🗣️ Moteur {name}")
+        try:
+            start = time.perf_counter()
+            backend = videoseul.get_tts_backend(name)
+            init_time = time.perf_counter() - start
+        except Exception as e:
+            print(f"⚠️ Moteur indisponible: {e}")
+            results.append({"backend": name, "available": False, "error": str(e)})
+            continue
+
+        latencies = []
+        synth_time = 0.0
+        audio_seconds = 0.0
+        for _ in range(repeat):
+            for text in TTS_CORPUS:
+                start = time.perf_counter()
+                first_audio = None
+                samples = 0
+                rate = None
+                for pcm, rate in backend.stream(text):
+                    if first_audio is None and len(pcm):
+                        first_audio = time.perf_counter() - start
+                    samples += len(pcm)
+                synth_time += time.perf_counter() - start
+                if rate:
+                    audio_seconds += samples / rate
+                if first_audio is not None:
+                    latencies.append(first_audio)
+        backend.close()
+
+        result = {
+            "backend": name,
+            "available": True,
+            "init_time_s": round(init_time, 4),
+            "first_audio_latency_s": round(statistics.median(latencies), 4) if latencies else None,
+            "real_time_factor": round(synth_time / audio_seconds, 4) if audio_seconds else None,
+            "audio_seconds": round(audio_seconds, 2),
+            "synthesis_seconds": round(synth_time, 2),
+        }
+        results.append(result)
+        print(f"   ⏱️ Initialisation: {result['init_time_s']} s")
+        print(f"   🎧 Latence premier audio (médiane): {result['first_audio_latency_s']} s")
+        print(f"   ⚡ Facteur temps réel: {result['real_time_factor']}")
+    return results
+
+def generate_markdown(sections, tables=True, images=True):
+    """Génère un document Markdown réaliste : titres, paragraphes, listes, tableaux, images et pagination"""
+    parts = []
+    for i in range(sections):
+        parts.append(f"## --- Page {i // 4 + 1} ---" if i % 4 == 0 else "")
+        parts.append(f"## Section {i + 1} : module de facturation\n")
+        parts.append("Le module de **facturation** génère les factures clients à partir des contrats "
+                     f"actifs (Page {i // 4 + 1}). Consultez la [documentation](https://exemple.fr/doc) "
+                     "et l'API REST associée.\n")
+        parts.append("- Saisie du dossier\n- Contrôle des barèmes\n- Validation et archivage\n")
+        if tables and i % 3 == 0:
+            parts.append("| Étape | Responsable | Délai |\n|---|---|---|\n"
+                         "| Saisie | Gestionnaire | 1 j |\n| Contrôle | Superviseur | 2 j |\n")
+        if images and i % 5 == 0:
+            parts.append(f"![Schéma {i}](images/schema_{i}.png)\n")
+    return "\n".join(parts)
+
+def legacy_slide_chain(videoseul, content, content_type):
+    """Chaîne historique : passes regex successives sur tout le document puis content.split('\\n\\n')"""
+    import re
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        # main() puis create_enhanced_presentation() appliquaient chacun remove_page_numbers
+        content = videoseul.remove_page_numbers(content)
+        content = videoseul.optimize_content_for_type(content, {"content_type": content_type})
+        content = videoseul.remove_page_numbers(content)
+    slides = []
+    for section in content.split('\n\n'):
+        if section.strip():
+            lines = section.split('\n')
+            text = '\n'.join(lines[1:]) if len(lines) > 1 else section
+            text = videoseul.clean_text_for_display(re.sub(r'!\[.*?\]\(.*?\)', '', text))
+            slides.append({"title": lines[0], "text": text,
+                           "narration": re.sub(r'[#*]', '', section) + "."})
+    return slides
+
+def benchmark_parser(sizes, repeat=5, content_type="technical"):
+    """Compare le parseur Markdown en une passe à la chaîne de regex historique"""
+    import videoseul
+
+    results = []
+    for sections in sizes:
+        content = generate_markdown(sections)
+        timings = {}
+        for name, parse in (
+            ("regex_chain", lambda: legacy_slide_chain(videoseul, content, content_type)),
+            ("single_pass", lambda: videoseul.parse_markdown_slides(content, True, content_type)),
+        ):
+            durations = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                slides = parse()
+                durations.append(time.perf_counter() - start)
+            timings[name] = {"median_s": round(statistics.median(durations), 5), "slides": len(slides)}
+
+        result = {
+            "sections": sections,
+            "document_kb": round(len(content.encode('utf-8')) / 1024, 1),
+            **timings,
+            "speedup": round(timings["regex_chain"]["median_s"] / timings["single_pass"]["median_s"], 2),
+        }
+        results.append(result)
+        print(f"\n📄 {sections} sections ({result['document_kb']} Ko)")
+        print(f"   🐢 Chaîne regex: {timings['regex_chain']['median_s']} s ({timings['regex_chain']['slides']} slides)")
+        print(f"   ⚡ Une passe: {timings['single_pass']['median_s']} s ({timings['single_pass']['slides']} slides)")
+        print(f"   📈 Accélération: x{result['speedup']}")
+    return results
+
+# Corpus du benchmark de rendu : (nom, tableaux, images)
+RENDER_VARIANTS = [("texte", False, False), ("tableaux_images", True, True)]
+
+def write_render_corpus(directory, sections, tables, images):
+    """Écrit le document généré et les images qu'il référence (images/schema_<i>.png)"""
+    from PIL import Image, ImageDraw
+
+    directory = Path(directory)
+    markdown_path = directory / f"corpus_{sections}.md"
+    markdown_path.write_text(generate_markdown(sections, tables, images), encoding='utf-8')
+    if images:
+        (directory / "images").mkdir(exist_ok=True)
+        for i in range(0, sections, 5):
+            image = Image.new("RGB", (1200, 800), (40 + i % 200, 90, 160))
+            ImageDraw.Draw(image).rectangle([100, 100, 1100, 700], outline=(255, 255, 255), width=12)
+            image.save(directory / "images" / f"schema_{i}.png")
+    return markdown_path
+
+def _render_corpus(markdown_path, renderer, quality, work_dir):
+    """Rend un corpus dans un processus neuf (pic mémoire propre à la mesure) et renvoie son rapport d'étapes"""
+    import videoseul
+
+    args = videoseul.parse_arguments([str(markdown_path), "--renderer", renderer, "--quality", quality,
+                                      "--no-avatar", "--output-dir", str(work_dir),
+                                      "--cache-dir", str(Path(work_dir) / "cache")])
+    with contextlib.redirect_stdout(io.StringIO()):
+        videoseul.configure_from_args(args)
+        result = videoseul.render_markdown_file(markdown_path, args, f"{renderer}.mp4")
+    return {"success": result["success"], "error": result.get("error"), "report": result["report"]}
+
+def benchmark_render(sizes, renderers, quality="draft"):
+    """Mesure chaque mode de rendu sur des corpus générés : images/s, secondes de vidéo par seconde, TTS, mémoire"""
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    # Un processus "spawn" par mesure : imports, caches et pic mémoire repartent de zéro
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for sections in sizes:
+        for variant, tables, images in RENDER_VARIANTS:
+            with tempfile.TemporaryDirectory() as corpus_dir:
+                markdown_path = write_render_corpus(corpus_dir, sections, tables, images)
+                print(f"\n📄 {sections} sections ({variant})")
+                for renderer in renderers:
+                    work_dir = Path(corpus_dir) / renderer
+                    work_dir.mkdir()
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                        run = pool.submit(_render_corpus, markdown_path, renderer, quality, work_dir).result()
+                    results.append(summarize_render(sections, variant, renderer, quality, run))
+                    print_render_result(results[-1])
+    return results
+
+def summarize_render(sections, variant, renderer, quality, run):
+    """Indicateurs d'une mesure à partir du rapport d'étapes de videoseul"""
+    report = run["report"]
+    stages = {span["stage"]: span for span in report.get("stages", [])}
+    total = report.get("total", {})
+    render = stages.get("render", {})
+    tts = stages.get("tts", {})
+    wall = total.get("wall_s") or None
+    return {
+        "sections": sections,
+        "variant": variant,
+        "renderer": renderer,
+        "quality": quality,
+        "success": run["success"],
+        "error": run["error"],
+        "slides": report.get("slides"),
+        "video_s": report.get("video_s"),
+        "wall_s": wall,
+        "frames": render.get("frames"),
+        "frames_per_s": round(render["frames"] / render["wall_s"], 1) if render.get("wall_s") else None,
+        "video_s_per_wall_s": round(report["video_s"] / wall, 2) if wall and report.get("video_s") else None,
+        "tts_real_time_factor": round(tts["wall_s"] / tts["audio_s"], 4) if tts.get("audio_s") else None,
+        # Processus neuf par mesure : le pic du processus est celui de ce rendu
+        "peak_rss_mb": total.get("process_peak_rss_mb"),
+        "peak_children_rss_mb": total.get("process_peak_children_rss_mb"),
+        "stages_s": {name: span["wall_s"] for name, span in stages.items()},
+    }
+
+def print_render_result(result):
+    if not result["success"]:
+        print(f"   ❌ {result['renderer']}: {result['error'] or 'échec du rendu'}")
+        return
+    print(f"   🎬 {result['renderer']}: {result['wall_s']} s pour {result['video_s']} s de vidéo "
+          f"(x{result['video_s_per_wall_s']}), {result['frames_per_s']} images/s, "
+          f"TTS RTF {result['tts_real_time_factor']}, pic mémoire {result['peak_rss_mb']} Mo")
+
+def save_results(kind, results, output):
+    """Ajoute les résultats au fichier JSON de benchmarks"""
+    output = Path(output)
+    history = []
+    if output.exists():
+        try:
+            history = json.loads(output.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            history = []
+    history.append({
+        "benchmark": kind,
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    })
+    output.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n💾 Résultats enregistrés dans {output}")
+
+def main():
+    import videoseul
+
+    parser = argparse.ArgumentParser(description='Benchmarks de performance de videoseul.py')
+    parser.add_argument('--output', '-o', default='benchmark_results.json',
+                        help='Fichier JSON où ajouter les résultats')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    tts_parser = subparsers.add_parser('tts', help='Compare les moteurs de synthèse vocale')
+    tts_parser.add_argument('--backends', nargs='+', default=['pyttsx3', 'espeak-ng'],
+                            help='Moteurs à comparer')
+    tts_parser.add_argument('--repeat', type=int, default=3, help='Nombre de passages sur le corpus')
+
+    parser_parser = subparsers.add_parser('parser', help='Compare le parseur Markdown à la chaîne de regex')
+    parser_parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000, 10000],
+                               help='Nombre de sections des documents générés')
+    parser_parser.add_argument('--repeat', type=int, default=5, help='Nombre de mesures par document')
+    parser_parser.add_argument('--content-type', default='technical',
+                               choices=['general', 'technical', 'educational', 'business'],
+                               help='Type de contenu (adaptation de la narration)')
+
+    render_parser = subparsers.add_parser('render', help='Compare les modes de rendu sur des corpus générés')
+    render_parser.add_argument('--sizes', nargs='+', type=int, default=[5, 50, 500],
+                               help='Nombre de sections des documents générés')
+    render_parser.add_argument('--renderers', nargs='+', default=['moviepy', 'segments', 'stream'],
+                               choices=['moviepy', 'segments', 'stream'], help='Modes de rendu à comparer')
+    render_parser.add_argument('--quality', default='draft', choices=list(videoseul.ENCODING_PROFILES),
+                               help='Profil d\'encodage (--quality de videoseul.py)')
+
+    args = parser.parse_args()
+
+    print("📊 Benchmarks videoseul.py")
+    print("=" * 60)
+    if args.command == 'tts':
+        results = benchmark_tts(args.backends, args.repeat)
+    elif args.command == 'parser':
+        results = benchmark_parser(args.sizes, args.repeat, args.content_type)
+    elif args.command == 'render':
+        results = benchmark_render(args.sizes, args.renderers, args.quality)
+    save_results(args.command, results, args.output)
+
+if __name__ == "__main__":
+    main()
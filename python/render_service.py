@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Service de rendu local pour videoseul.py
+Les travaux (Markdown + options) sont stockés dans une file SQLite et rendus par un pool
+de processus gardés chauds ; l'avancement est consultable par HTTP pendant le rendu.
+
+API :
+  POST /jobs                  {"markdown": "...", "options": {"quality": "draft", ...}} -> {"id": ...}
+  GET  /jobs                  derniers travaux
+  GET  /jobs/<id>             état, étape, avancement, position dans la file
+  GET  /jobs/<id>/events      avancement en direct (text/event-stream)
+  GET  /jobs/<id>/result      vidéo produite
+  GET  /health
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sqlite3
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Options acceptées dans "options" (équivalent des options de videoseul.py) ;
+# les chemins de sortie et de cache restent choisis par le service
+JOB_OPTIONS = {
+    "model", "quality", "resolution", "fps", "renderer", "workers", "slides_per_segment",
+    "text_renderer", "tts_backend", "tts_workers", "no_tts_cache", "no_segment_cache", "no_output_cache",
+    "no_page_numbers", "direct_reading", "enhance_ai", "no_avatar", "avatar_corner",
+    "animate_text", "no_transitions", "dynamic_slides",
+}
+POLL_INTERVAL = 0.5  # Secondes entre deux lectures de la file par un processus inoccupé
+WATCHDOG_INTERVAL = 1.0  # Secondes entre deux vérifications des processus de rendu
+MAX_MARKDOWN_BYTES = 10 * 1024 * 1024
+# Bornes des options fournies par les clients : le service partage la machine entre les travaux
+MAX_JOB_WORKERS = os.cpu_count() or 1
+MAX_JOB_PIXELS = 3840 * 2160
+# Un travail qui fait tomber le service à chaque essai n'est pas repris indéfiniment
+MAX_JOB_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    options TEXT NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    stage TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    output TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    time REAL NOT NULL,
+    stage TEXT NOT NULL,
+    progress REAL NOT NULL,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS events_job ON events(job_id, seq);
+"""
+
+def options_to_argv(options):
+    """Traduit les options d'un travail en arguments de videoseul.py ; ValueError si une option est inconnue"""
+    unknown = set(options) - JOB_OPTIONS
+    if unknown:
+        raise ValueError(f"Options inconnues: {', '.join(sorted(unknown))}")
+    argv = []
+    for name, value in sorted(options.items()):
+        flag = "--" + name.replace("_", "-")
+        if value is True:
+            argv.append(flag)
+        elif value is not False and value is not None:  # 0 est une valeur, pas une option absente
+            argv.extend([flag, str(value)])
+    return argv
+
+def parse_job_options(options, markdown_file="job.md"):
+    """Valide les options avec l'analyseur de videoseul.py ; ValueError si elles sont refusées"""
+    import contextlib
+    import io
+    import videoseul
+
+    argv = [str(markdown_file)] + options_to_argv(options)
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            args = videoseul.parse_arguments(argv)
+    except SystemExit:
+        lines = stderr.getvalue().strip().splitlines()
+        raise ValueError(lines[-1].split("error: ", 1)[-1] if lines else "options invalides")
+
+    for name in ("workers", "tts_workers"):
+        if (getattr(args, name) or 1) > MAX_JOB_WORKERS:
+            raise ValueError(f"{name} limité à {MAX_JOB_WORKERS} sur ce service")
+    if args.resolution and args.resolution[0] * args.resolution[1] > MAX_JOB_PIXELS:
+        raise ValueError("résolution limitée à 3840x2160 sur ce service")
+    return args
+
+class JobStore:
+    """File de travaux persistante : une connexion SQLite par appel, utilisable depuis plusieurs processus"""
+
+    def __init__(self, data_dir):
+        # Chemin absolu : les sorties sont passées à videoseul avec output_dir = dossier du travail
+        self.data_dir = Path(data_dir).resolve()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.data_dir / "jobs.sqlite3"
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            # Files créées avant la colonne "worker" (pid du processus qui rend le travail)
+            if "worker" not in {row["name"] for row in db.execute("PRAGMA table_info(jobs)")}:
+                db.execute("ALTER TABLE jobs ADD COLUMN worker INTEGER")
+
+    def _connect(self):
+        db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return _Connection(db)
+
+    def job_dir(self, job_id):
+        return self.data_dir / "jobs" / job_id
+
+    def submit(self, markdown, options=None):
+        """Enregistre un travail en attente ; le Markdown est écrit dans le dossier du travail"""
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = self.job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / "input.md").write_text(markdown, encoding="utf-8")
+        with self._connect() as db:
+            db.execute("INSERT INTO jobs (id, status, options, created) VALUES (?, 'queued', ?, ?)",
+                       (job_id, json.dumps(options or {}, ensure_ascii=False), time.time()))
+        self.add_event(job_id, "queued", 0.0)
+        return job_id
+
+    def claim_next(self, worker=None):
+        """Réserve le plus ancien travail en attente pour le processus worker (transaction exclusive)"""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1").fetchone()
+                if row is None:
+                    db.execute("COMMIT")
+                    return None
+                db.execute("UPDATE jobs SET status = 'running', started = ?, stage = 'start', progress = 0, "
+                           "attempts = attempts + 1, worker = ? WHERE id = ?", (time.time(), worker, row["id"]))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def add_event(self, job_id, stage, progress, message=""):
+        with self._connect() as db:
+            db.execute("INSERT INTO events (job_id, time, stage, progress, message) VALUES (?, ?, ?, ?, ?)",
+                       (job_id, time.time(), stage, progress, message))
+            db.execute("UPDATE jobs SET stage = ?, progress = ?, message = ? WHERE id = ?",
+                       (stage, progress, message, job_id))
+
+    def finish(self, job_id, output=None, error=None):
+        status = "done" if output and not error else "failed"
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status = ?, finished = ?, output = ?, error = ? WHERE id = ?",
+                       (status, time.time(), output, error, job_id))
+        self.add_event(job_id, status, 1.0, error or "")
+        return status
+
+    def requeue_interrupted(self, worker=None, max_attempts=MAX_JOB_ATTEMPTS):
+        """Remet en file les travaux restés "running" après un arrêt du service (ou du seul processus worker) ;
+        ceux déjà tentés max_attempts fois passent en échec. Renvoie (remis en file, en échec)"""
+        error = f"interrompu {max_attempts} fois, abandonné"
+        where, params = "status = 'running'", ()
+        if worker is not None:
+            where, params = where + " AND worker = ?", (worker,)
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            failed = [row["id"] for row in db.execute(
+                f"SELECT id FROM jobs WHERE {where} AND attempts >= ?", params + (max_attempts,))]
+            db.execute(f"UPDATE jobs SET status = 'failed', finished = ?, error = ? "
+                       f"WHERE {where} AND attempts >= ?", (time.time(), error) + params + (max_attempts,))
+            requeued = db.execute(f"UPDATE jobs SET status = 'queued', stage = 'queued', progress = 0, "
+                                  f"worker = NULL WHERE {where}", params).rowcount
+            db.execute("COMMIT")
+        for job_id in failed:
+            self.add_event(job_id, "failed", 1.0, error)
+        return requeued, len(failed)
+
+    def get(self, job_id):
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            job["options"] = json.loads(job["options"])
+            if job["status"] == "queued":
+                job["queue_position"] = db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created < ?", (job["created"],)
+                ).fetchone()[0] + 1
+        return job
+
+    def list(self, limit=50):
+        with self._connect() as db:
+            rows = db.execute("SELECT id, status, stage, progress, created, finished FROM jobs "
+                              "ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def events(self, job_id, after=0):
+        with self._connect() as db:
+            rows = db.execute("SELECT seq, time, stage, progress, message FROM events "
+                              "WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)).fetchall()
+        return [dict(row) for row in rows]
+
+class _Connection:
+    """Connexion SQLite fermée en sortie de bloc (sqlite3 ne ferme pas la connexion avec "with")"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, *exc):
+        self.db.close()
+        return False
+
+# === Processus de rendu ===
+
+def render_job(store, job, tts_backends):
+    """Rend un travail dans le processus courant avec les paramètres de ses options"""
+    import videoseul
+
+    job_dir = store.job_dir(job["id"])
+    markdown_file = job_dir / "input.md"
+    args = parse_job_options(job["options"], markdown_file)
+    args.output_dir = str(job_dir)
+    videoseul.configure_from_args(args)
+    videoseul.AVATAR_PATH = None if args.no_avatar else videoseul.configure_avatar(args.avatar_path)
+
+    # Un moteur TTS par nom de moteur, conservé entre les travaux du processus
+    if args.tts_backend not in tts_backends:
+        try:
+            tts_backends[args.tts_backend] = videoseul.get_tts_backend(args.tts_backend)
+        except Exception as e:
+            print(f"⚠️ Moteur TTS {args.tts_backend} indisponible: {e}")
+            tts_backends[args.tts_backend] = None
+
+    videoseul.PROGRESS_CALLBACK = lambda stage, progress, message: store.add_event(job["id"], stage, progress, message)
+    try:
+        return videoseul.render_markdown_file(markdown_file, args, str(job_dir / f"{job['id']}.mp4"),
+                                              tts_backends[args.tts_backend])
+    finally:
+        videoseul.PROGRESS_CALLBACK = None
+
+def worker_loop(data_dir, stop_event):
+    """Boucle d'un processus de rendu : réserve un travail, le rend, recommence jusqu'à l'arrêt du service"""
+    # Ctrl+C atteint tout le groupe de processus : seul stop_event arrête le processus, après son travail
+    # (ignoré aussi par ffmpeg et les pools lancés ensuite, qui héritent de ce réglage)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    store = JobStore(data_dir)
+    tts_backends = {}
+    while not stop_event.is_set():
+        job = store.claim_next(os.getpid())
+        if job is None:
+            stop_event.wait(POLL_INTERVAL)
+            continue
+        print(f"🎬 Travail {job['id']} pris en charge (processus {os.getpid()})")
+        try:
+            result = render_job(store, job, tts_backends)
+            error = None if result["success"] else result.get("error", "échec du rendu")
+            status = store.finish(job["id"], result["output"], error)
+        except Exception as e:
+            status = store.finish(job["id"], error=str(e))
+        print(f"{'✅' if status == 'done' else '❌'} Travail {job['id']}: {status}")
+    for backend in tts_backends.values():
+        if backend is not None:
+            backend.close()
+
+# === API HTTP ===
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """Routes de l'API ; self.server.store est la file de travaux"""
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, payload, status=HTTPStatus.OK):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_json({"error": message}, status)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self.send_error_json(HTTPStatus.NOT_FOUND, "route inconnue")
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            return self.send_error_json(HTTPStatus.BAD_REQUEST, "en-tête Content-Length invalide")
+        if length > MAX_MARKDOWN_BYTES:
+            return self.send_error_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "document trop volumineux")
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            markdown = payload["markdown"]
+            options = payload.get("options") or {}
+            if not isinstance(markdown, str) or not isinstance(options, dict):
+                raise ValueError("\"markdown\" doit être du texte et \"options\" un objet")
+            parse_job_options(options)
+        except (KeyError, TypeError, ValueError) as e:
+            return self.send_error_json(HTTPStatus.BAD_REQUEST, f"requête invalide: {e}")
+        job_id = self.server.store.submit(markdown, options)
+        self.send_json({"id": job_id, "status": "queued"}, HTTPStatus.ACCEPTED)
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if parts == ["health"]:
+            return self.send_json({"status": "ok", "workers": self.server.worker_count})
+        if parts == ["jobs"]:
+            return self.send_json({"jobs": self.server.store.list()})
+        if len(parts) < 2 or parts[0] != "jobs":
+            return self.send_error_json(HTTPStatus.NOT_FOUND, "route inconnue")
+
+        job = self.server.store.get(parts[1])
+        if job is None:
+            return self.send_error_json(HTTPStatus.NOT_FOUND, "travail inconnu")
+        if len(parts) == 2:
+            return self.send_json(job)
+        if parts[2] == "events":
+            return self.stream_events(job)
+        if parts[2] == "result":
+            return self.send_result(job)
+        self.send_error_json(HTTPStatus.NOT_FOUND, "route inconnue")
+
+    def stream_events(self, job):
+        """Envoie les étapes du travail au fil de l'eau (Server-Sent Events) jusqu'à sa fin"""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        last = 0
+        try:
+            while True:
+                for event in self.server.store.events(job["id"], last):
+                    last = event["seq"]
+                    self.wfile.write(f"id: {last}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    if event["stage"] in ("done", "failed"):
+                        return
+                self.wfile.flush()
+                time.sleep(POLL_INTERVAL)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_result(self, job):
+        if job["status"] != "done" or not job["output"] or not Path(job["output"]).exists():
+            return self.send_error_json(HTTPStatus.CONFLICT, f"vidéo indisponible (état: {job['status']})")
+        path = Path(job["output"])
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.send_header("Content-Disposition", f'attachment; filename="{path.name}"')
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile)
+
+def start_worker(data_dir, stop_event, index):
+    # Processus non démoniques : le rendu par segments y crée son propre pool
+    process = multiprocessing.Process(target=worker_loop, args=(str(data_dir), stop_event),
+                                      name=f"videoseul-render-{index}")
+    process.start()
+    return process
+
+def replace_dead_workers(store, processes, stop_event):
+    """Remplace les processus de rendu morts (crash, OOM killer...) ; leur travail en cours est
+    remis en file, ou passe en échec après MAX_JOB_ATTEMPTS essais"""
+    for index, process in enumerate(processes):
+        if process.is_alive():
+            continue
+        requeued, failed = store.requeue_interrupted(worker=process.pid)
+        print(f"💥 Processus {process.name} arrêté (code {process.exitcode}) : "
+              f"{requeued} travail remis en file, {failed} en échec ; redémarrage")
+        processes[index] = start_worker(store.data_dir, stop_event, index)
+    return processes
+
+def serve(host, port, data_dir, workers=1, verbose=False):
+    """Démarre le pool de rendu puis l'API HTTP ; Ctrl+C arrête les processus après leur travail en cours"""
+    store = JobStore(data_dir)
+    requeued, failed = store.requeue_interrupted()
+    if requeued:
+        print(f"♻️ {requeued} travail(aux) interrompu(s) remis en file")
+    if failed:
+        print(f"❌ {failed} travail(aux) interrompu(s) {MAX_JOB_ATTEMPTS} fois marqué(s) en échec")
+
+    stop_event = multiprocessing.Event()
+    processes = [start_worker(store.data_dir, stop_event, i) for i in range(max(1, workers))]
+
+    server = ThreadingHTTPServer((host, port), RenderRequestHandler)
+    server.store = store
+    server.worker_count = len(processes)
+    server.verbose = verbose
+    print(f"🌐 Service de rendu sur http://{host}:{server.server_address[1]} "
+          f"({len(processes)} processus, file: {store.path})")
+    # L'API tourne dans un thread : le thread principal surveille les processus de rendu
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    try:
+        while True:
+            time.sleep(WATCHDOG_INTERVAL)
+            replace_dead_workers(store, processes, stop_event)
+    except KeyboardInterrupt:
+        print("\n⏹️ Arrêt du service (travaux en cours terminés avant l'arrêt)...")
+    finally:
+        server.shutdown()
+        server.server_close()
+        stop_event.set()
+        for process in processes:
+            process.join()
+
+def main():
+    parser = argparse.ArgumentParser(description='Service HTTP de rendu vidéo pour videoseul.py')
+    parser.add_argument('--host', default='127.0.0.1', help='Adresse d\'écoute (défaut : locale uniquement)')
+    parser.add_argument('--port', type=int, default=8765, help='Port HTTP')
+    parser.add_argument('--workers', type=int, default=1, help='Nombre de processus de rendu')
+    parser.add_argument('--data-dir', default='render_jobs',
+                        help='Dossier de la file SQLite et des vidéos produites')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Journaliser chaque requête HTTP')
+    args = parser.parse_args()
+
+    print("🚀 Service de rendu videoseul.py")
+    print("=" * 60)
+    serve(args.host, args.port, args.data_dir, args.workers, args.verbose)
+
+if __name__ == "__main__":
+    main()
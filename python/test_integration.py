@@ -10,9 +10,7 @@ import subprocess
 import tempfile
 from pathlib import Path
 
-def create_test_markdown():
-    """Crée un fichier Markdown de test"""
-    test_content = """# Test de Génération Vidéo
+TEST_MARKDOWN = """# Test de Génération Vidéo
 
 ## Introduction
 
@@ -37,10 +35,12 @@ Ce projet utilise:
 
 Merci d'avoir testé notre système de génération de vidéos éducatives avec IA Deep Learning.
 """
-    
+
+def create_test_markdown():
+    """Crée un fichier Markdown de test"""
     # Créer un fichier temporaire
     with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False, encoding='utf-8') as f:
-        f.write(test_content)
+        f.write(TEST_MARKDOWN)
         return f.name
 
 def test_videoseul_compatibility():
@@ -183,6 +183,769 @@ def test_path_setup():
     except ImportError:
         print("❌ Impossible d'importer videoseul.py")
 
+def test_text_renderer_cache():
+    """Teste le moteur de texte Pillow et son cache de blocs"""
+    print("\n🔤 Test du moteur de texte en processus")
+    print("-" * 30)
+    
+    import videoseul
+    
+    videoseul.render_text_block.cache_clear()
+    block = videoseul.render_text_block("Bonjour à tous " * 10, 36, 400, "West")
+    again = videoseul.render_text_block("Bonjour à tous " * 10, 36, 400, "West")
+    
+    assert block.shape[1] == 400 and block.shape[2] == 4
+    assert block is again, "le bloc de texte aurait dû venir du cache"
+    assert not block.flags.writeable
+    assert videoseul.render_text_block.cache_info().hits == 1
+    print(f"✅ Bloc {block.shape[1]}x{block.shape[0]} rendu puis servi depuis le cache")
+
+def test_markdown_parser():
+    """Vérifie le découpage Markdown en slides typés (une seule passe)"""
+    print("\n🧪 Test du parseur Markdown")
+    print("=" * 50)
+
+    import videoseul
+
+    content = TEST_MARKDOWN + """
+| Étape | Délai |
+|---|---|
+| Saisie | 1 j |
+
+![Schéma](images/schema.png)
+Page 3
+"""
+    slides = videoseul.parse_markdown_slides(content, skip_page_numbers=True)
+    titles = [slide["title"] for slide in slides]
+    assert titles[0] == "Test de Génération Vidéo", titles
+    assert "Section 1: Fonctionnalités" in titles, titles
+
+    features = next(slide for slide in slides if slide["title"] == "Section 1: Fonctionnalités")
+    assert features["bullets"][0] == "Génération automatique de vidéos", features
+    assert features["text"].startswith("• "), features
+
+    table = next(slide for slide in slides if slide["tables"])
+    assert table["tables"] == [[["Étape", "Délai"], ["Saisie", "1 j"]]], table
+    assert any(slide["images"] == ["images/schema.png"] for slide in slides)
+    assert all("#" not in slide["narration"] and "Page 3" not in slide["text"] for slide in slides)
+
+    # Pause après chaque terme technique, quel que soit le caractère qui le suit
+    technical = videoseul.parse_markdown_slides(
+        "## API\n\n- Appel (REST)\n- HTTP/HTTPS\n- Format \"JSON\"\n- « Docker »\n- Base SQL\n"
+        "- Déployé sur Kubernetes\n- APIs, mon_API et classes\n", content_type="technical")[0]["narration"]
+    for spoken in ("(REST...)", "HTTP.../HTTPS...", '"JSON..."', "« Docker... »", "Base SQL...",
+                   "Kubernetes...", "APIs, mon_API et classes."):
+        assert spoken in technical, (spoken, technical)
+    print(f"✅ {len(slides)} slides typés")
+
+def test_table_rendering():
+    """Vérifie le rendu natif des tableaux (fonds, zébrures, bordures)"""
+    print("\n🧪 Test du rendu des tableaux")
+    print("=" * 50)
+
+    import time
+    import videoseul
+
+    rows = [["Étape", "Responsable", "Délai"]] + [[f"Étape {i}", "Gestionnaire", f"{i} j"] for i in range(30)]
+    start = time.perf_counter()
+    image = videoseul.render_table(rows, 880, 1000)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert image.shape[1] <= 880 and image.shape[0] <= 1000, image.shape
+    assert tuple(image[0, 0]) == videoseul.TABLE_BORDER
+    assert tuple(image[2, -3]) == videoseul.TABLE_HEADER_BG
+    assert tuple(image[-3, -3]) == videoseul.TABLE_ROW_BG_2  # 30 lignes : la dernière est paire
+    print(f"✅ Tableau de 30 lignes rasterisé en {elapsed_ms:.1f} ms")
+
+def test_image_slides():
+    """Vérifie la pré-passe images : résolution des chemins et réduction à la boîte du slide"""
+    print("\n🧪 Test des slides avec images")
+    print("=" * 50)
+
+    import videoseul
+
+    base_dir = Path(__file__).resolve().parent
+    slides = [
+        {"title": "Figure", "text": "", "images": ["eca1/_page_5_Figure_10.jpeg", "introuvable.png"]},
+        {"title": "Texte et figure", "text": "• Capital", "images": ["eca1/_page_50_Figure_10.jpeg"]},
+    ]
+    videoseul.prepare_slide_images(slides, base_dir)
+    assert [len(slide["images"]) for slide in slides] == [1, 1], slides
+
+    _, _, boxes = videoseul.slide_layout("Texte et figure", True, 1)
+    image = videoseul.load_image_asset(slides[1]["images"][0], boxes[0][2], boxes[0][3])
+    assert image.shape[1] <= boxes[0][2] and image.shape[0] <= boxes[0][3], image.shape
+
+    frame = videoseul.render_slide_frame(slides[0]["title"], "", slides[0]["images"])
+    assert frame.shape == (videoseul.HEIGHT, videoseul.WIDTH, 3)
+    print(f"✅ Images préparées ({videoseul.ASSET_CACHE.hits} hit(s) du cache d'assets)")
+
+def test_text_animation():
+    """Vérifie l'animation d'apparition du texte rendue en mémoire (étapes dédupliquées)"""
+    print("\n🧪 Test de l'animation du texte")
+    print("=" * 50)
+
+    import numpy as np
+    import videoseul
+
+    text = "• Première ligne\n\n\n\n• Dernière ligne"
+    runs = [(frame.copy(), repeat) for frame, repeat in
+            videoseul.iter_animation_frames("Animation", text, None, None, 120)]
+    assert sum(repeat for _, repeat in runs) == 120
+    assert len(runs) <= videoseul.ANIMATION_FRAMES
+    assert np.array_equal(runs[-1][0], videoseul.render_slide_frame("Animation", text))
+    assert not videoseul.DUMP_ANIMATION_FRAMES
+
+    # Clip MoviePy calculé à la demande : mêmes images, y compris après un retour en arrière
+    fps = videoseul.ENCODING_SETTINGS["fps"]
+    expected = [frame for frame, repeat in runs for _ in range(repeat)]
+    clip = videoseul.animated_slide_clip("Animation", text, duration=120 / fps)
+    assert all(np.array_equal(clip.get_frame(i / fps), expected[i]) for i in range(120))
+    assert np.array_equal(clip.get_frame(3 / fps), expected[3])
+
+    # Slide avec image : la colonne d'images est identique du premier au dernier état de l'animation
+    with tempfile.TemporaryDirectory() as tmp:
+        image = str(Path(tmp) / "figure.png")
+        videoseul.Image.new("RGB", (300, 200), (200, 40, 40)).save(image)
+        first = next(videoseul.iter_animation_frames("Figure", text, [image], None, 120))[0].copy()
+        entry = videoseul.slide_entry_frame({"title": "Figure", "text": text, "images": [image], "animate": True})
+        final = videoseul.render_slide_frame("Figure", text, [image])
+        x, y, width, height = videoseul.slide_layout("Figure", True, 1)[2][0]
+        for frame in (first, entry):
+            assert np.array_equal(frame[y:y + height, x:x + width], final[y:y + height, x:x + width])
+    print(f"✅ {len(runs)} image(s) distincte(s) pour 120 images")
+
+def test_transitions():
+    """Vérifie le fondu enchaîné : seules les images de la fenêtre de transition changent"""
+    print("\n🧪 Test des transitions")
+    print("=" * 50)
+
+    import numpy as np
+    import videoseul
+
+    slides = [{"title": "Avant", "text": "• Un", "duration": 3}, {"title": "Après", "text": "• Deux", "duration": 3}]
+    videoseul.link_slide_transitions(slides)
+    fps = videoseul.ENCODING_SETTINGS["fps"]
+    frames = [frame.copy() for frame in videoseul.iter_slide_frames(slides[0], 3 * fps)]
+    count = videoseul.transition_frame_count(3 * fps)
+
+    still = videoseul.render_slide_frame("Avant", "• Un")
+    target = videoseul.slide_entry_frame(slides[1])
+    assert len(frames) == 3 * fps and count == int(round(videoseul.TRANSITION_DUR * fps))
+    assert all(np.array_equal(frame, still) for frame in frames[:-count])
+    distances = [np.abs(frame.astype(int) - target).mean() for frame in frames[-count:]]
+    assert distances == sorted(distances, reverse=True), distances
+    print(f"✅ Fondu de {count} images vers le slide suivant")
+
+def test_batch_manifest():
+    """Vérifie la liste des fichiers du mode batch : dossier, liste texte, liste JSON et noms de sortie"""
+    print("\n🧪 Test du mode batch")
+    print("=" * 50)
+
+    import json
+    import tempfile
+    import videoseul
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "cours").mkdir()
+        for name in ("b.md", "a.md", "notes.txt"):
+            (tmp / "cours" / name).write_text("# Titre\n\nTexte", encoding="utf-8")
+        (tmp / "liste.txt").write_text("# Release\ncours/b.md\n\ncours/a.md\n", encoding="utf-8")
+        (tmp / "liste.json").write_text(json.dumps([str(tmp / "cours" / "a.md")]), encoding="utf-8")
+
+        assert [p.name for p in videoseul.load_batch_manifest(tmp / "cours")] == ["a.md", "b.md"]
+        assert videoseul.load_batch_manifest(tmp / "liste.txt") == [tmp / "cours" / "b.md", tmp / "cours" / "a.md"]
+        assert videoseul.load_batch_manifest(tmp / "liste.json") == [tmp / "cours" / "a.md"]
+
+    names = videoseul.batch_output_names(["un/cours.md", "deux/cours.md", "intro.md"])
+    assert names == ["cours.mp4", "cours_2.mp4", "intro.mp4"], names
+    print("✅ Dossier, listes texte/JSON et noms de sortie uniques")
+
+def test_render_service_queue():
+    """Vérifie la file du service de rendu : ordre, réservation, avancement et reprise après arrêt"""
+    print("\n🧪 Test de la file du service de rendu")
+    print("=" * 50)
+
+    import tempfile
+    import render_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = render_service.JobStore(tmp)
+        first = store.submit("# Un\n\nTexte", {"quality": "draft"})
+        second = store.submit("# Deux\n\nTexte")
+        assert store.get(second)["queue_position"] == 2
+
+        job = store.claim_next()
+        assert job["id"] == first and job["status"] == "running" and job["options"] == {"quality": "draft"}
+        store.add_event(first, "tts", 0.1, "2 slides")
+        assert store.get(first)["stage"] == "tts"
+
+        # Arrêt du service pendant le rendu : le travail repasse en file, devant le suivant
+        reopened = render_service.JobStore(tmp)
+        assert reopened.requeue_interrupted() == (1, 0)
+        assert reopened.claim_next()["id"] == first
+        assert reopened.finish(first, error="échec") == "failed"
+        assert [event["stage"] for event in reopened.events(first)][-2:] == ["tts", "failed"]
+
+        # Un travail qui interrompt le service à chaque essai finit en échec au lieu de boucler
+        for attempt in range(render_service.MAX_JOB_ATTEMPTS):
+            assert reopened.claim_next()["id"] == second
+            expected = (1, 0) if attempt + 1 < render_service.MAX_JOB_ATTEMPTS else (0, 1)
+            assert reopened.requeue_interrupted() == expected
+        job = reopened.get(second)
+        assert job["status"] == "failed" and job["attempts"] == render_service.MAX_JOB_ATTEMPTS and job["error"]
+        assert reopened.events(second)[-1]["stage"] == "failed" and reopened.claim_next() is None
+
+    assert render_service.options_to_argv({"quality": "draft", "no_avatar": True, "animate_text": False}) == \
+        ["--no-avatar", "--quality", "draft"]
+    for options in ({"output_dir": "/tmp"}, {"quality": "ultra"}, {"workers": 0}, {"tts_workers": "deux"},
+                    {"workers": render_service.MAX_JOB_WORKERS + 1}, {"resolution": "100000x100000"},
+                    {"resolution": "1080p"}):
+        try:
+            render_service.parse_job_options(options)
+            assert False, options
+        except ValueError as e:
+            print(f"✅ Option refusée: {e}")
+
+    # Requêtes malformées : réponse 400, jamais de trace côté serveur
+    import http.client
+    import threading
+    from http.server import ThreadingHTTPServer
+    with tempfile.TemporaryDirectory() as tmp:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), render_service.RenderRequestHandler)
+        server.store, server.worker_count, server.verbose = render_service.JobStore(tmp), 0, False
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            for headers, body in (({"Content-Length": "abc"}, b""), ({"Content-Length": "-5"}, b""),
+                                  ({"Content-Length": "2"}, b"[]")):
+                connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+                connection.putrequest("POST", "/jobs")
+                for name, value in headers.items():
+                    connection.putheader(name, value)
+                connection.endheaders(body)
+                assert connection.getresponse().status == 400, headers
+                connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+    print("✅ File persistante et reprise des travaux interrompus")
+
+def test_configure_between_jobs():
+    """Vérifie qu'un processus gardé chaud ne transmet pas les options d'un travail au suivant"""
+    print("\n🧪 Test de la configuration entre deux travaux")
+    print("=" * 50)
+
+    import tempfile
+    import videoseul
+
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            videoseul.configure_from_args(videoseul.parse_arguments(
+                ["un.md", "--workers", "3", "--cache-dir", tmp, "--renderer", "segments"]))
+            assert videoseul.SEGMENT_WORKERS == 3 and videoseul.TTS_CACHE.cache_dir == Path(tmp) / "tts"
+        finally:
+            videoseul.configure_from_args(videoseul.parse_arguments(["deux.md"]))
+    assert videoseul.SEGMENT_WORKERS == (os.cpu_count() or 1) and videoseul.RENDER_MODE == "moviepy"
+    for cache, name in ((videoseul.TTS_CACHE, "tts"), (videoseul.SEGMENT_CACHE, "segments"),
+                        (videoseul.OUTPUT_CACHE, "outputs")):
+        assert cache.cache_dir == videoseul.CACHE_ROOT / name, cache.cache_dir
+    print("✅ Options du travail précédent réinitialisées")
+
+def test_render_service_interrupt():
+    """Vérifie qu'un Ctrl+C n'interrompt pas un processus de rendu : seul l'arrêt du service le termine"""
+    print("\n🧪 Test de l'arrêt du service de rendu")
+    print("=" * 50)
+
+    import multiprocessing
+    import signal
+    import tempfile
+    import time
+    import render_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stop_event = multiprocessing.Event()
+        worker = multiprocessing.Process(target=render_service.worker_loop, args=(tmp, stop_event))
+        worker.start()
+        try:
+            time.sleep(1)
+            os.kill(worker.pid, signal.SIGINT)
+            time.sleep(render_service.POLL_INTERVAL * 2)
+            assert worker.is_alive(), "le processus de rendu ne doit pas mourir sur SIGINT"
+        finally:
+            stop_event.set()
+            worker.join(10)
+        assert worker.exitcode == 0, worker.exitcode
+    print("✅ SIGINT ignoré, arrêt propre via stop_event")
+
+    # Processus de rendu tué pendant un travail : le travail est remis en file et le processus remplacé
+    with tempfile.TemporaryDirectory() as tmp:
+        store = render_service.JobStore(tmp)
+        job_id = store.submit("# Un\n\nTexte")
+        dead = multiprocessing.Process(target=time.sleep, args=(30,))
+        dead.start()
+        assert store.claim_next(dead.pid)["worker"] == dead.pid
+        os.kill(dead.pid, signal.SIGKILL)
+        dead.join(10)
+
+        stop_event = multiprocessing.Event()
+        stop_event.set()  # Le remplaçant s'arrête aussitôt au lieu de rendre le travail
+        processes = render_service.replace_dead_workers(store, [dead], stop_event)
+        assert processes[0] is not dead
+        processes[0].join(10)
+        assert processes[0].exitcode == 0, processes[0].exitcode
+        job = store.get(job_id)
+        assert job["status"] == "queued" and job["worker"] is None, job
+    print("✅ Processus mort remplacé, son travail remis en file")
+
+def test_render_report():
+    """Vérifie le rapport d'étapes : compteurs par étape, totaux et fichier JSON"""
+    print("\n🧪 Test du rapport de rendu")
+    print("=" * 50)
+
+    import json
+    import tempfile
+    import time
+    import videoseul
+
+    report = videoseul.RenderReport()
+    with report.stage("render") as span:
+        span["frames"] = 48
+        span["bytes"] = 1024
+    try:
+        with report.stage("avatar"):
+            raise RuntimeError("ffmpeg absent")
+    except RuntimeError:
+        pass
+
+    import mmap
+    with report.stage("tts"):
+        # Pages neuves hors de l'allocateur (qui peut réutiliser de la mémoire déjà résidente), écrites
+        buffer = mmap.mmap(-1, 64 * 1024 * 1024)
+        buffer.write(b"x" * len(buffer))
+    with report.stage("images"):
+        # Mémoire libérée avant la fin de l'étape : seul le pic de l'étape la voit
+        transient = mmap.mmap(-1, 64 * 1024 * 1024)
+        transient.write(b"x" * len(transient))
+        transient.close()
+
+    data = report.to_dict()
+    assert [span["stage"] for span in data["stages"]] == ["render", "avatar", "tts", "images"]
+    assert data["total"]["frames"] == 48 and data["total"]["bytes"] == 1024
+    assert all(span["wall_s"] >= 0 and "cpu_s" in span for span in data["stages"])
+    # Mémoire par étape : variation et pic de l'étape, pas le pic cumulé du processus
+    render, _, tts, images = data["stages"]
+    if tts["rss_delta_mb"] is not None:
+        assert tts["rss_delta_mb"] >= 48 and tts["peak_rss_mb"] >= tts["rss_mb"], tts
+        assert abs(render["rss_delta_mb"]) < 48 and render["peak_rss_mb"] - render["rss_mb"] < 48, render
+        assert abs(images["rss_delta_mb"]) < 48 and images["peak_rss_mb"] - images["rss_mb"] >= 48, images
+        # Le pic du processus couvre toujours toute sa vie malgré les remises à zéro par étape
+        assert data["total"]["process_peak_rss_mb"] >= max(span["peak_rss_mb"] for span in data["stages"])
+    assert "process_peak_rss_mb" in data["total"]
+    buffer.close()
+
+    # Repli sans VmHWM : échantillonnage dans un thread
+    sampler = videoseul.RSSSampler(interval=0.005)
+    if sampler.peak:
+        transient = mmap.mmap(-1, 64 * 1024 * 1024)
+        transient.write(b"x" * len(transient))
+        time.sleep(0.1)
+        transient.close()
+        assert sampler.stop() - videoseul.get_current_rss() >= 48 * 1024 * 1024
+    else:
+        sampler.stop()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = report.save(Path(tmp) / "video.report.json")
+        assert json.loads(path.read_text(encoding="utf-8"))["stages"][0]["frames"] == 48
+    print(f"✅ Étapes mesurées: {report.summary()}")
+
+def test_html_export():
+    """Vérifie le deck HTML : puces, tableaux échappés, images copiées et timeline JSON"""
+    print("\n🧪 Test de l'export HTML")
+    print("=" * 50)
+
+    import json
+    import tempfile
+    import videoseul
+
+    html = videoseul.slide_html({"title": "Coûts <TTC>", "text": "Intro\n• Capital\n• Taux",
+                                 "tables": [[["Poste", "Montant"], ["Frais", "10 & 20"]]]}, ["assets/a.png"])
+    assert "<h1>Coûts &lt;TTC&gt;</h1>" in html and "<ul><li>Capital</li><li>Taux</li></ul>" in html
+    assert "<th>Poste</th>" in html and "<td>10 &amp; 20</td>" in html and 'src="assets/a.png"' in html
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image = Path(tmp) / "schema.png"
+        videoseul.Image.new("RGB", (40, 30), (0, 90, 160)).save(image)
+        slides = [{"title": "Un", "text": "• A", "duration": 3, "images": [str(image)]},
+                  {"title": "Deux", "text": "B", "duration": 2}]
+        index = videoseul.export_html_deck(slides, videoseul.build_timeline(slides), Path(tmp) / "deck", "Cours")
+        timeline = json.loads((index.parent / "timeline.json").read_text(encoding="utf-8"))
+        assert [entry["start"] for entry in timeline["slides"]] == [0, 3] and timeline["duration"] == 5
+        assert len(list((index.parent / "assets").glob("*.png"))) == 1
+        assert index.read_text(encoding="utf-8").count('<section class="slide">') == 2
+    print("✅ Deck HTML et timeline générés sans encodage vidéo")
+
+def test_in_memory_narration():
+    """Vérifie la narration sans fichier : PCM gardé en mémoire puis piste alignée sur la timeline"""
+    print("\n🧪 Test de la narration en mémoire")
+    print("=" * 50)
+
+    import numpy as np
+    import videoseul
+
+    class ToneBackend(videoseul.TTSBackend):
+        name = "tone"
+
+        def synthesize(self, text):
+            return np.full((len(text) * 100, 1), len(text), dtype=np.int16), 8000
+
+    slides = [{"title": "Un", "narration": "Bonjour.", "duration": 3},
+              {"title": "Deux", "narration": "", "duration": 2},
+              {"title": "Trois", "narration": "Merci pour tout.", "duration": 3}]
+    videoseul.synthesize_slide_narrations(slides, tts_cache=False, backend=ToneBackend())
+    assert slides[0]["audio_path"] is None and slides[0]["audio_pcm"][1] == 8000
+    assert slides[0]["duration"] == max(videoseul.MIN_SLIDE_DUR, 0.1 + videoseul.NARRATION_PADDING)
+
+    timeline = videoseul.build_timeline(slides)
+    track, rate = videoseul.assemble_narration_track(timeline)
+    assert rate == 8000 and len(track) == int(round(timeline[-1]["end"] * rate))
+    start = int(round(timeline[2]["start"] * rate))
+    assert (track[start:start + 1600] == 16).all() and (track[800:start] == 0).all()
+    print(f"✅ Piste de {len(track) / rate:.1f} s assemblée sans fichier WAV")
+
+def test_output_cache():
+    """Vérifie le cache des vidéos finales : clé sensible au contenu, aux images et aux options, lien physique"""
+    print("\n🧪 Test du cache des vidéos finales")
+    print("=" * 50)
+
+    import os
+    import tempfile
+    import videoseul
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        image = tmp / "schema.png"
+        image.write_bytes(b"v1")
+        content = f"# Cours\n\nTexte\n\n![Schéma]({image})"
+
+        key = videoseul.output_cache_key(content)
+        assert key == videoseul.output_cache_key(content)
+        assert key != videoseul.output_cache_key(content + " modifié")
+        assert key != videoseul.output_cache_key(content, "technical")
+        old_mode = videoseul.RENDER_MODE
+        videoseul.RENDER_MODE = "stream" if old_mode != "stream" else "segments"
+        try:
+            assert key != videoseul.output_cache_key(content)
+        finally:
+            videoseul.RENDER_MODE = old_mode
+        image.write_bytes(b"version 2")
+        assert key != videoseul.output_cache_key(content)
+
+        cache = videoseul.OutputCache(tmp / "outputs")
+        video = tmp / "a.mp4"
+        video.write_bytes(b"mp4")
+        cached = cache.put_link(key, video)
+        assert cache.get(key) == cached and cache.stats()["hits"] == 1
+        copy = tmp / "b.mp4"
+        videoseul.reuse_cached_output(cached, copy)
+        assert copy.read_bytes() == b"mp4"
+        if os.stat(copy).st_nlink > 1:
+            assert os.path.samefile(copy, cached)
+    print("✅ Clé de cache et réutilisation de la vidéo")
+
+def probe_video(path):
+    """Nombre d'images et durée (s) de la piste vidéo : ffprobe, sinon décodage complet par ffmpeg"""
+    import re
+    import shutil
+    import videoseul
+
+    if shutil.which("ffprobe"):
+        result = subprocess.run(["ffprobe", "-v", "error", "-select_streams", "v:0", "-count_frames",
+                                 "-show_entries", "stream=nb_read_frames,duration", "-of", "csv=p=0", str(path)],
+                                capture_output=True, text=True, check=True)
+        duration, frames = result.stdout.strip().split(",")[:2]
+        return int(frames), float(duration)
+
+    result = subprocess.run([videoseul.get_ffmpeg_binary(), "-i", str(path), "-map", "0:v", "-f", "null", "-"],
+                            capture_output=True, text=True)
+    frames = int(re.findall(r"frame=\s*(\d+)", result.stderr)[-1])
+    h, m, s = re.search(r"Duration: (\d+):(\d+):([\d.]+)", result.stderr).groups()
+    return frames, int(h) * 3600 + int(m) * 60 + float(s)
+
+def test_segment_frame_count():
+    """Vérifie que le rendu par segments écrit exactement round(durée x fps) images, comme MoviePy"""
+    print("\n🧪 Test du nombre d'images des segments")
+    print("=" * 50)
+
+    import tempfile
+    import numpy as np
+    import videoseul
+    from moviepy.video.compositing.concatenate import concatenate_videoclips
+
+    fps = videoseul.ENCODING_SETTINGS["fps"]
+    # Durées alignées sur l'image pour lesquelles np.arange(0, d, 1/fps) compte une image de trop
+    counts = [25, 31, 14, 50, 17, 23]
+    slides = [{"title": f"Slide {i}", "text": "• Point", "duration": k / fps} for i, k in enumerate(counts)]
+    expected = sum(counts)
+
+    old_cache = videoseul.SEGMENT_CACHE_ENABLED
+    videoseul.SEGMENT_CACHE_ENABLED = False
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            segmented = Path(tmp) / "segments.mp4"
+            videoseul.render_segments_parallel(slides, segmented, workers=2)
+
+            reference = Path(tmp) / "moviepy.mp4"
+            clip = concatenate_videoclips([videoseul.slide_clip(s["title"], s["text"], duration=s["duration"])
+                                           for s in slides])
+            clip.write_videofile(str(reference), fps=fps, codec=videoseul.ENCODING_SETTINGS["codec"],
+                                 preset="ultrafast", audio=False, verbose=False, logger=None)
+            clip.close()
+
+            frames, duration = probe_video(segmented)
+            reference_frames, reference_duration = probe_video(reference)
+
+            # Avec narration (AAC, -shortest perdait des images sur ce découpage) : rien n'est coupé au multiplexage
+            narrated = [{"title": f"Slide {i}", "text": "• Point", "duration": k / fps} for i, k in enumerate((37, 12, 50))]
+            samples = int(round(99 / fps * 22050))
+            narration = ((np.sin(np.arange(samples) / 7) * 8000).astype(np.int16).reshape(-1, 1), 22050)
+            muxed = Path(tmp) / "narration.mp4"
+            videoseul.render_segments_parallel(narrated, muxed, narration, workers=2)
+            assert probe_video(muxed)[0] == 99
+            videoseul.render_slides_streaming(narrated, muxed, narration)
+            assert probe_video(muxed)[0] == 99
+    finally:
+        videoseul.SEGMENT_CACHE_ENABLED = old_cache
+
+    assert frames == reference_frames == expected, (frames, reference_frames, expected)
+    assert abs(duration - reference_duration) < 0.5 / fps, (duration, reference_duration)
+    print(f"✅ {frames} images ({duration:.2f} s) pour {len(slides)} segments, identique à MoviePy")
+
+def test_segment_cache():
+    """Vérifie le rendu incrémental : segments réutilisés, réencodage limité au slide modifié, éviction LRU"""
+    print("\n🧪 Test du cache de segments")
+    print("=" * 50)
+
+    import os
+    import tempfile
+    import videoseul
+
+    def render(slides, output):
+        stats = {}
+        videoseul.link_slide_transitions(slides)
+        videoseul.render_segments_parallel(slides, output, workers=2, slides_per_segment=1, stats=stats)
+        return stats["segments_encoded"], stats["segments_reused"]
+
+    old_cache, old_enabled = videoseul.SEGMENT_CACHE, videoseul.SEGMENT_CACHE_ENABLED
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        videoseul.SEGMENT_CACHE = videoseul.SegmentCache(tmp / "segments")
+        videoseul.SEGMENT_CACHE_ENABLED = True
+        try:
+            slides = [{"title": f"Slide {i}", "text": f"• Point {i}", "duration": 1} for i in range(5)]
+            assert render(slides, tmp / "a.mp4") == (5, 0)
+            assert render(slides, tmp / "b.mp4") == (0, 5)
+
+            # Slide 2 modifié : son segment et celui du slide 1, qui fond vers lui, sont réencodés
+            slides[2]["text"] = "• Point modifié"
+            assert render(slides, tmp / "c.mp4") == (2, 3)
+            assert (tmp / "c.mp4").stat().st_size > 0
+        finally:
+            videoseul.SEGMENT_CACHE, videoseul.SEGMENT_CACHE_ENABLED = old_cache, old_enabled
+
+        # Éviction LRU : au-delà de la taille maximale, les entrées les moins récemment lues partent
+        cache = videoseul.SegmentCache(tmp / "lru", max_bytes=250)
+        paths = []
+        for i, key in enumerate(("a" * 64, "b" * 64, "c" * 64)):
+            source = tmp / f"{i}.mp4"
+            source.write_bytes(b"x" * 100)
+            paths.append(cache.put_file(key, source))
+            os.utime(paths[-1], (1000 + i, 1000 + i))
+        assert cache.get("a" * 64) == paths[0]  # Relu : devient le plus récent
+        cache.evict()
+        assert [path.exists() for path in paths] == [True, False, True]
+        assert cache.evictions == 1
+    print("✅ Segments réutilisés, réencodage local après modification, éviction LRU")
+
+def test_tts_cache():
+    """Vérifie le cache TTS : narrations identiques synthétisées une fois, relues au rendu suivant"""
+    print("\n🧪 Test du cache TTS")
+    print("=" * 50)
+
+    import tempfile
+    import numpy as np
+    import videoseul
+
+    class CountingBackend(videoseul.TTSBackend):
+        name = "compteur"
+        calls = 0
+
+        def synthesize(self, text):
+            CountingBackend.calls += 1
+            return np.full((len(text) * 100, 1), 7, dtype=np.int16), 8000
+
+    def slides():
+        return [{"title": "Un", "narration": "Bonjour."}, {"title": "Deux", "narration": "Suite."},
+                {"title": "Trois", "narration": "Bonjour."}]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = videoseul.TTSCache(tmp)
+        first = videoseul.synthesize_slide_narrations(slides(), tts_cache=cache, backend=CountingBackend())
+        assert CountingBackend.calls == 2  # Textes identiques synthétisés une seule fois
+        assert first[0]["audio_path"] == first[2]["audio_path"]
+
+        second = videoseul.synthesize_slide_narrations(slides(), tts_cache=cache, backend=CountingBackend())
+        assert CountingBackend.calls == 2 and cache.hits == 3
+        assert [s["audio_path"] for s in second] == [s["audio_path"] for s in first]
+        assert second[0]["duration"] == first[0]["duration"]
+
+        videoseul.synthesize_slide_narrations(slides(), tts_cache=cache, backend=CountingBackend(rate=200))
+        assert CountingBackend.calls == 4  # Autre débit : autre clé
+    print(f"✅ {CountingBackend.calls} synthèses pour 9 narrations, {cache.hits} relues du cache")
+
+def test_stream_renderer():
+    """Vérifie le rendu en flux : images et narration multiplexées, nettoyage de ffmpeg après une erreur"""
+    print("\n🧪 Test du rendu en flux")
+    print("=" * 50)
+
+    import tempfile
+    import numpy as np
+    import videoseul
+
+    fps = videoseul.ENCODING_SETTINGS["fps"]
+    slides = videoseul.link_slide_transitions([{"title": "Un", "text": "• A", "duration": 1.5},
+                                               {"title": "Deux", "text": "• B", "duration": 1}])
+    narration = (np.zeros((int(2.5 * 8000), 1), dtype=np.int16), 8000)
+    processes = []
+    open_writer = videoseul.open_ffmpeg_writer
+
+    def tracked_writer(*args, **kwargs):
+        processes.append(open_writer(*args, **kwargs))
+        return processes[-1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "flux.mp4"
+        stats = {}
+        videoseul.render_slides_streaming(slides, output, narration, stats=stats)
+        frames, duration = probe_video(output)
+        assert frames == stats["frames"] == int(round(2.5 * fps)), (frames, stats)
+        assert not (Path(tmp) / "flux.video.mp4").exists()
+
+        # Slide invalide au milieu du flux : ffmpeg est arrêté et la vidéo partielle supprimée
+        videoseul.open_ffmpeg_writer = tracked_writer
+        try:
+            videoseul.render_slides_streaming(slides + [{"text": "sans titre", "duration": 1}],
+                                              Path(tmp) / "echec.mp4", narration)
+            assert False, "le slide invalide aurait dû interrompre le rendu"
+        except KeyError:
+            pass
+        finally:
+            videoseul.open_ffmpeg_writer = open_writer
+        assert processes and processes[0].poll() is not None
+        assert not list(Path(tmp).glob("echec*"))
+    print(f"✅ {frames} images ({duration:.2f} s) en flux, ffmpeg arrêté après une erreur")
+
+def test_encoding_profiles():
+    """Vérifie les profils d'encodage : résolution forcée au pair, mise en page à l'échelle, erreurs d'usage"""
+    print("\n🧪 Test des profils d'encodage")
+    print("=" * 50)
+
+    import contextlib
+    import io
+    import videoseul
+
+    args = videoseul.parse_arguments(["cours.md", "--quality", "draft", "--resolution", "1281x721", "--fps", "15"])
+    assert args.resolution == (1280, 720) and args.fps == 15
+    for bad in (["--resolution", "1280"], ["--resolution", "8x8"], ["--fps", "0"]):
+        stderr = io.StringIO()
+        try:
+            with contextlib.redirect_stderr(stderr):
+                videoseul.parse_arguments(["cours.md", *bad])
+            assert False, bad
+        except SystemExit as e:
+            assert e.code == 2 and "usage:" in stderr.getvalue(), stderr.getvalue()
+
+    previous = videoseul.ENCODING_SETTINGS["profile"], (videoseul.WIDTH, videoseul.HEIGHT), videoseul.ENCODING_SETTINGS["fps"]
+    try:
+        settings = videoseul.apply_encoding_profile(args.quality, args.resolution, args.fps)
+        assert (videoseul.WIDTH, videoseul.HEIGHT) == (1280, 720) and settings["fps"] == 15
+        assert settings["preset"] == videoseul.ENCODING_PROFILES["draft"]["preset"]
+        assert videoseul.FONT_SIZE_TITLE == round(videoseul.BASE_LAYOUT["FONT_SIZE_TITLE"] * 720 / videoseul.BASE_HEIGHT)
+        assert videoseul.render_slide_frame("Titre", "• Point").shape == (720, 1280, 3)
+    finally:
+        videoseul.apply_encoding_profile(*previous)
+    print("✅ Profil draft en 1280x720 @ 15 i/s, valeurs invalides refusées par argparse")
+
+def test_avatar_overlay():
+    """Vérifie l'incrustation de l'avatar : coin choisi, durée et audio de la vidéo conservés"""
+    print("\n🧪 Test de l'incrustation de l'avatar")
+    print("=" * 50)
+
+    import tempfile
+    import numpy as np
+    import videoseul
+
+    def last_frame(path):
+        result = subprocess.run([videoseul.get_ffmpeg_binary(), "-loglevel", "error", "-sseof", "-0.2", "-i", str(path),
+                                 "-frames:v", "1", "-f", "rawvideo", "-pix_fmt", "rgb24", "-"],
+                                capture_output=True, check=True)
+        return np.frombuffer(result.stdout, dtype=np.uint8).reshape(videoseul.HEIGHT, videoseul.WIDTH, 3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # Avatar d'une seconde (plus court que la vidéo : lu en boucle), vert uni
+        avatar = tmp / "avatar.mp4"
+        subprocess.run([videoseul.get_ffmpeg_binary(), "-loglevel", "error", "-f", "lavfi",
+                        "-i", "color=c=0x00ff00:s=320x240:d=1", "-pix_fmt", "yuv420p", str(avatar)], check=True)
+        video = tmp / "cours.mp4"
+        slides = [{"title": "Avatar", "text": "• Point", "duration": 2.5}]
+        videoseul.render_slides_streaming(slides, video, (np.zeros((2 * 8000 + 4000, 1), dtype=np.int16), 8000))
+        frames, duration = probe_video(video)
+        before = last_frame(video)
+
+        videoseul.overlay_avatar(video, avatar, "top-left")
+        after = last_frame(video)
+        assert probe_video(video) == (frames, duration)
+        margin = videoseul.px(20)
+        assert after[margin + 5, margin + 5, 1] > 200 and after[margin + 5, margin + 5, 0] < 60
+        corner = (slice(videoseul.HEIGHT - 40, None), slice(videoseul.WIDTH - 40, None))
+        assert np.abs(after[corner].astype(int) - before[corner]).mean() < 8  # Autres coins intacts
+        streams = subprocess.run([videoseul.get_ffmpeg_binary(), "-i", str(video)], capture_output=True, text=True).stderr
+        assert "Audio:" in streams
+        assert not list(tmp.glob("*.avatar.mp4"))
+    print(f"✅ Avatar incrusté en haut à gauche, {frames} images et piste audio conservées")
+
+IMPORT_TIME_BUDGET_MS = 250
+
+def test_import_time():
+    """Vérifie que l'import de videoseul reste léger (python -X importtime)"""
+    print("\n⏱️ Test du temps d'import de videoseul.py")
+    print("-" * 30)
+    
+    code = ("import sys, videoseul; "
+            "print(','.join(m for m in ('moviepy', 'pyttsx3', 'sklearn', 'pandas', 'matplotlib', "
+            "'drawbot_skia', 'ollama', 'nltk') if m in sys.modules))")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, encoding='utf-8',
+        cwd=Path(__file__).parent
+    )
+    assert result.returncode == 0, result.stderr
+    
+    # Ligne "import time: self [us] | cumulative | module" du module videoseul
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == 'videoseul':
+            cumulative_us = int(parts[1])
+    assert cumulative_us is not None, "mesure -X importtime introuvable"
+    
+    heavy_modules = result.stdout.strip()
+    assert not heavy_modules, f"modules lourds importés au chargement: {heavy_modules}"
+    assert cumulative_us / 1000 < IMPORT_TIME_BUDGET_MS, f"import trop lent: {cumulative_us / 1000:.0f} ms"
+    print(f"✅ Import en {cumulative_us / 1000:.0f} ms (budget {IMPORT_TIME_BUDGET_MS} ms), aucun module lourd chargé")
+
 def main():
     """Fonction principale de test"""
     print("🚀 Test d'Intégration - Interface PyQt5 ↔ videoseul.py")
@@ -196,6 +959,27 @@ def main():
     # Tests
     test_argument_parsing()
     test_path_setup()
+    test_text_renderer_cache()
+    test_markdown_parser()
+    test_table_rendering()
+    test_image_slides()
+    test_text_animation()
+    test_transitions()
+    test_batch_manifest()
+    test_render_service_queue()
+    test_configure_between_jobs()
+    test_render_service_interrupt()
+    test_render_report()
+    test_html_export()
+    test_in_memory_narration()
+    test_output_cache()
+    test_segment_frame_count()
+    test_segment_cache()
+    test_tts_cache()
+    test_stream_renderer()
+    test_encoding_profiles()
+    test_avatar_overlay()
+    test_import_time()
     
     # Test complet (commenté par défaut car prend du temps)
     response = input("\n❓ Voulez-vous exécuter le test complet de génération vidéo? (y/N): ")
@@ -1,63 +1,50 @@
 # === Partie 1 : IMPORTS et CONFIGURATIONS videoseul.py ===
+# Les dépendances lourdes (MoviePy, pyttsx3, ollama...) sont importées à la demande
+# par les fonctions qui en ont besoin : l'import du module ne fait aucun travail.
+import math
 import os
-import random
 import re
+import sys
 import time
 import unicodedata
-import pyttsx3
+import wave
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import gc
 import argparse
+import hashlib
+import importlib.util
 import json
 import logging
-from collections import defaultdict
+import multiprocessing
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 
 from pathlib import Path
-from io import BytesIO
-from moviepy.editor import TextClip, ImageClip, ColorClip, CompositeVideoClip, concatenate_videoclips, AudioFileClip, ImageSequenceClip
-from moviepy.audio.AudioClip import AudioClip
-from moviepy.config import change_settings
-import drawbot_skia.drawbot as drawBot
-
-from sklearn import decomposition, cluster, manifold, preprocessing
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import confusion_matrix, accuracy_score, classification_report, mean_squared_error, r2_score
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-# Intégration avec les autres modules du projet
-try:
-    import pdfplumber
-    import pytesseract
-    from PIL import Image
-    import fitz  # PyMuPDF
-    import ollama
-    PDF_PROCESSING_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ Modules PDF optionnels non disponibles: {e}")
-    PDF_PROCESSING_AVAILABLE = False
-
-try:
-    import nltk
-    from nltk.stem import WordNetLemmatizer
-    from nltk.tokenize import word_tokenize
-    NLTK_AVAILABLE = True
-except ImportError:
-    print("⚠️ NLTK non disponible - fonctionnalités de traitement de texte limitées")
-    NLTK_AVAILABLE = False
+from PIL import Image, ImageDraw, ImageFont
+
+def _module_available(name):
+    """Vérifie qu'un module est installé sans l'importer"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+# Intégration avec les autres modules du projet (disponibilité vérifiée sans import)
+PDF_PROCESSING_AVAILABLE = all(_module_available(name) for name in ("pdfplumber", "pytesseract", "fitz", "ollama"))
+NLTK_AVAILABLE = _module_available("nltk")
 
 # Options globales pour la lecture directe
 DIRECT_READING_MODE = False
 SKIP_PAGE_NUMBERS = False
 
-# Config ImageMagick
-change_settings({
-    "IMAGEMAGICK_BINARY": r"C:\\Program Files\\ImageMagick-7.1.1-Q16-HDRI\\magick.exe"
-})
+# Config ImageMagick (utilisé uniquement par le moteur de texte "imagemagick")
+IMAGEMAGICK_BINARY = r"C:\\Program Files\\ImageMagick-7.1.1-Q16-HDRI\\magick.exe"
 
 # Configuration dynamique des chemins
 def setup_paths(markdown_file=None, output_dir="output", output_filename=None):
@@ -85,8 +72,7 @@ def setup_paths(markdown_file=None, output_dir="output", output_filename=None):
         else:
             OUTPUT_VIDEO_PATH = OUTPUT_DIR / "presentation_fidele.mp4"
     
-    ANIMATION_DIR = OUTPUT_DIR / "animations"
-    ANIMATION_DIR.mkdir(exist_ok=True)
+    ANIMATION_DIR = OUTPUT_DIR / "animations"  # Créé seulement avec --dump-animation-frames
     
     # Recherche du logo dans plusieurs emplacements
     possible_logos = [
@@ -105,15 +91,14 @@ def setup_paths(markdown_file=None, output_dir="output", output_filename=None):
     
     return INPUT_MD, BASE_DIR, OUTPUT_DIR, ANIMATION_DIR, LOGO_PATH, OUTPUT_VIDEO_PATH
 
-# Initialisation par défaut
-INPUT_MD, BASE_DIR, OUTPUT_DIR, ANIMATION_DIR, LOGO_PATH, DEFAULT_OUTPUT_VIDEO_PATH = setup_paths()
+# Chemins résolus au lancement par setup_paths() (aucun accès disque à l'import)
+INPUT_MD = BASE_DIR = OUTPUT_DIR = ANIMATION_DIR = LOGO_PATH = DEFAULT_OUTPUT_VIDEO_PATH = None
 
-# Nettoyage fichiers audio corrompus
-for f in OUTPUT_DIR.glob("*.wav"):
-    try:
-        f.unlink()
-    except Exception as e:
-        print(f"❌ Impossible de supprimer {f.name} : {e}")
+def ensure_paths():
+    """Initialise les chemins par défaut si setup_paths() n'a pas encore été appelé"""
+    global INPUT_MD, BASE_DIR, OUTPUT_DIR, ANIMATION_DIR, LOGO_PATH, DEFAULT_OUTPUT_VIDEO_PATH
+    if OUTPUT_DIR is None:
+        INPUT_MD, BASE_DIR, OUTPUT_DIR, ANIMATION_DIR, LOGO_PATH, DEFAULT_OUTPUT_VIDEO_PATH = setup_paths()
 
 # Paramètres Généraux
 FONT_SIZE_TITLE = 50
@@ -127,20 +112,129 @@ TABLE_ROW_BG_1 = (248, 248, 248)
 TABLE_ROW_BG_2 = (255, 255, 255)
 TABLE_BORDER = (180, 180, 180)
 TEXT_MARGIN = 40
+TABLE_CELL_PADDING = 8  # Marge intérieure des cellules pour FONT_SIZE_TABLE
+MIN_FONT_SIZE_TABLE = 12
+TABLE_ROWS_PER_SLIDE = 10  # Au-delà, le tableau continue sur le slide suivant
+LAYOUT_SCALE = 1.0  # Mise à l'échelle de la mise en page (1.0 = 540 lignes)
 INTRO_DUR = 3
 OUTRO_DUR = 3
 SLIDE_DUR = 8
+MIN_SLIDE_DUR = 2
+NARRATION_PADDING = 0.5  # Silence ajouté après la narration de chaque slide
 TRANSITION_DUR = 1
-ANIMATION_FRAMES = 15  # 🧹 Moins d'images pour animation DrawBot
+TRANSITIONS_ENABLED = True  # --no-transitions : coupes franches entre les slides
+
+# Avatar en incrustation (picture-in-picture), ajouté par une passe ffmpeg sur la vidéo finie
+AVATAR_PATH = None  # Défini par main() à partir de --avatar-path / --no-avatar
+AVATAR_WIDTH_RATIO = 0.22  # Largeur de l'avatar relative à la largeur de la vidéo
+AVATAR_CORNER = "bottom-right"
+AVATAR_OVERLAY_POSITIONS = {
+    "bottom-right": ("main_w-overlay_w-{m}", "main_h-overlay_h-{m}"),
+    "bottom-left": ("{m}", "main_h-overlay_h-{m}"),
+    "top-right": ("main_w-overlay_w-{m}", "{m}"),
+    "top-left": ("{m}", "{m}"),
+}
+ANIMATION_FRAMES = 15  # 🧹 Étapes distinctes de l'animation d'apparition du texte
 ANIMATION_DURATION = 2
+ANIMATE_TEXT = False  # --animate-text : le corps des slides apparaît progressivement
+DUMP_ANIMATION_FRAMES = False  # --dump-animation-frames : PNG des étapes dans ANIMATION_DIR (débogage)
+
+# Rendu statique : chaque slide est aplatie une seule fois en une image RGB
+# (fond + titre + texte + logo) puis émise comme un segment fixe
+STATIC_SLIDES = True
+
+# Profils d'encodage (--quality) : résolution, images/s, preset x264, CRF et tune
+ENCODING_PROFILES = {
+    "draft": {"resolution": (640, 360), "fps": 12, "preset": "ultrafast", "crf": 30, "tune": "stillimage"},
+    "fast": {"resolution": (960, 540), "fps": 24, "preset": "veryfast", "crf": 25, "tune": "stillimage"},
+    "medium": {"resolution": (960, 540), "fps": 24, "preset": "faster", "crf": 23, "tune": "stillimage"},
+    "high": {"resolution": (1920, 1080), "fps": 30, "preset": "slow", "crf": 18, "tune": "stillimage"},
+}
+DEFAULT_ENCODING_PROFILE = "medium"
+
+# Paramètres d'encodage communs à tous les modes de rendu (segments identiques)
+ENCODING_SETTINGS = {
+    "profile": DEFAULT_ENCODING_PROFILE,
+    "fps": 24,
+    "codec": "libx264",
+    "audio_codec": "aac",
+    "preset": "faster",
+    "crf": 23,
+    "tune": "stillimage",
+}
+
+# Valeurs de mise en page de référence (540 lignes), mises à l'échelle par apply_encoding_profile()
+BASE_LAYOUT = {
+    "FONT_SIZE_TITLE": FONT_SIZE_TITLE,
+    "FONT_SIZE_TEXT": FONT_SIZE_TEXT,
+    "FONT_SIZE_TABLE": FONT_SIZE_TABLE,
+    "TEXT_MARGIN": TEXT_MARGIN,
+}
+BASE_HEIGHT = 540
+
+# Mode de rendu : "moviepy" (un seul write_videofile), "segments" (un segment par slide
+# encodé dans un pool de processus puis concaténé sans réencodage) ou "stream" (images
+# envoyées slide par slide sur l'entrée standard de ffmpeg, mémoire constante)
+RENDER_MODE = "moviepy"
+SEGMENT_WORKERS = os.cpu_count() or 1
+SLIDES_PER_SEGMENT = 1
+
+# Export HTML (--html, --html-only) : diapositives statiques, une narration AAC par slide et timeline JSON
+HTML_EXPORT = False
+VIDEO_EXPORT = True
+HTML_AUDIO_BITRATE = "64k"
 
-# Synthèse Vocale
-engine = pyttsx3.init()
-engine.setProperty('rate', 150)
+# Suivi d'avancement (render_service) : fonction appelée avec (étape, avancement 0..1, message)
+PROGRESS_CALLBACK = None
+
+# Cache des images décodées (logo, figures) partagé par tout le processus
+ASSET_CACHE_MAX_BYTES = 256 * 1024 * 1024
+IMAGE_DECODE_WORKERS = min(8, os.cpu_count() or 1)  # Threads de la pré-passe images
+IMAGE_COLUMN_RATIO = 0.45  # Largeur réservée aux images quand le slide contient aussi du texte
+
+# Moteur de rendu du texte : "pillow" (en processus, avec cache) ou "imagemagick" (TextClip caption)
+TEXT_RENDERER = "pillow"
+TEXT_INTERLINE = 1.2
+TEXT_BLOCK_CACHE_SIZE = 128
+FONT_CANDIDATES = [
+    os.environ.get("VIDEOSEUL_FONT", ""),
+    r"C:\Windows\Fonts\arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "DejaVuSans.ttf",
+    "arial.ttf",
+]
+
+# Synthèse Vocale : moteur hors ligne sélectionnable ("pyttsx3", "espeak-ng")
+TTS_BACKEND_NAME = "pyttsx3"
+TTS_RATE = 150
+TTS_VOICE = None
+
+PYTTSX3_FLUSH_TIMEOUT = 2.0  # Attente maximale du fichier d'un énoncé signalé terminé
+
+# Pool de processus pour la synthèse (chaque processus possède son propre moteur)
+TTS_WORKERS = 1
+
+# Cache disque des narrations synthétisées, adressé par hash(texte, voix, débit, moteur)
+CACHE_ROOT = Path(os.environ.get("VIDEOSEUL_CACHE_DIR", Path.home() / ".cache" / "videoseul"))
+TTS_CACHE_ENABLED = True
+TTS_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# Cache des segments encodés pour le rendu incrémental (--renderer segments)
+SEGMENT_CACHE_ENABLED = True
+SEGMENT_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+RENDER_CACHE_VERSION = 3  # À incrémenter quand le rendu d'un slide change
+
+# Cache des vidéos finales : même Markdown, mêmes fichiers référencés et mêmes options -> vidéo réutilisée
+OUTPUT_CACHE_ENABLED = True
+OUTPUT_CACHE_MAX_BYTES = 8 * 1024 * 1024 * 1024
 
 # === Partie 2 : FONCTIONS UTILITAIRES ===
 
-def parse_arguments():
+def parse_arguments(argv=None):
     """Parse les arguments de la ligne de commande - Compatible avec le script principal"""
     parser = argparse.ArgumentParser(
         description='Générateur de vidéos éducatives - Deep Learning Enhanced',
@@ -151,16 +245,27 @@ Exemples d'utilisation:
   python videoseul.py document.md --html             # Génération HTML + vidéo
   python videoseul.py document.md --no-page-numbers  # Mode lecture fluide
   python videoseul.py document.md --enhance-ai       # Avec amélioration IA
+  python videoseul.py --batch cours/ --output-dir videos  # Tous les .md d'un dossier
         """
     )
     
     # Arguments principaux - Compatible avec le script de référence
-    parser.add_argument('markdown_file', help='Fichier Markdown à traiter')
+    parser.add_argument('markdown_file', nargs='?', help='Fichier Markdown à traiter')
+    parser.add_argument('--batch', metavar='DOSSIER_OU_LISTE',
+                       help='Traiter plusieurs fichiers dans un seul processus : dossier de .md, '
+                            'liste texte (un chemin par ligne) ou liste JSON')
+    parser.add_argument('--batch-workers', type=positive_int, default=1,
+                       help='Nombre de processus du mode batch (défaut : 1, fichiers traités à la suite)')
     parser.add_argument('--model', default='microsoft/phi-2', help='Modèle de langage à utiliser')
-    parser.add_argument('--html', action='store_true', help='Générer des diapositives HTML')
+    parser.add_argument('--html', action='store_true',
+                       help='Générer aussi un deck HTML (slides statiques, narration par slide, timeline JSON)')
+    parser.add_argument('--html-only', action='store_true',
+                       help='Générer uniquement le deck HTML, sans encodage vidéo')
     parser.add_argument('--no-avatar', action='store_true', help='Désactiver l\'ajout de l\'avatar')
     parser.add_argument('--avatar-path', help='Chemin personnalisé vers la vidéo de l\'avatar',
                        default="H:/formation-main/avatar.mp4")
+    parser.add_argument('--avatar-corner', choices=list(AVATAR_OVERLAY_POSITIONS), default=AVATAR_CORNER,
+                       help='Coin de la vidéo où incruster l\'avatar')
     parser.add_argument('--output', '-o', help='Nom de fichier de sortie pour la vidéo (.mp4)')
     parser.add_argument('--output-dir', help='Dossier de sortie pour les fichiers générés')
     
@@ -174,16 +279,49 @@ Exemples d'utilisation:
     parser.add_argument('--pdf', help='Fichier PDF à extraire et convertir en Markdown')
     parser.add_argument('--enhance-ai', action='store_true', help='Améliorer le contenu avec IA')
     parser.add_argument('--extract-sections', action='store_true', help='Extraire et grouper les sections similaires')
-    parser.add_argument('--resolution', help='Résolution vidéo (960x540, 1920x1080)', default='960x540')
-    parser.add_argument('--fps', type=int, help='Images par seconde', default=24)
-    parser.add_argument('--quality', help='Qualité vidéo (fast, medium, high)', default='medium')
+    parser.add_argument('--resolution', type=parse_resolution,
+                       help='Résolution vidéo (960x540, 1920x1080) - remplace celle du profil')
+    parser.add_argument('--fps', type=positive_int, help='Images par seconde - remplace celles du profil')
+    parser.add_argument('--quality', choices=list(ENCODING_PROFILES), default=DEFAULT_ENCODING_PROFILE,
+                       help='Profil d\'encodage : draft (aperçu rapide), fast, medium, high (1080p)')
+    parser.add_argument('--dynamic-slides', action='store_true',
+                       help='Recomposer chaque image des slides (désactive le rendu statique aplati)')
+    parser.add_argument('--no-transitions', action='store_true',
+                       help='Désactiver les fondus enchaînés entre les slides (coupes franches)')
+    parser.add_argument('--animate-text', action='store_true',
+                       help='Faire apparaître progressivement le texte des slides (animation rendue en mémoire)')
+    parser.add_argument('--dump-animation-frames', action='store_true',
+                       help='Débogage : écrire les étapes des animations en PNG dans output/animations')
+    parser.add_argument('--text-renderer', choices=['pillow', 'imagemagick'], default='pillow',
+                       help='Moteur de rendu du texte : pillow (en processus, avec cache) ou imagemagick (TextClip)')
+    parser.add_argument('--renderer', choices=['moviepy', 'segments', 'stream'], default='moviepy',
+                       help='Mode de rendu : moviepy (un seul encodage), segments (encodage parallèle par slide) '
+                            'ou stream (flux d\'images vers ffmpeg, mémoire constante)')
+    parser.add_argument('--workers', type=positive_int, default=None,
+                       help='Nombre de processus pour le rendu par segments (défaut : nombre de cœurs)')
+    parser.add_argument('--slides-per-segment', type=positive_int, default=1,
+                       help='Nombre de slides regroupées dans chaque segment encodé')
+    parser.add_argument('--tts-backend', choices=['pyttsx3', 'espeak-ng'], default='pyttsx3',
+                       help='Moteur de synthèse vocale hors ligne')
+    parser.add_argument('--tts-workers', type=positive_int, default=1,
+                       help='Nombre de processus de synthèse vocale en parallèle')
+    parser.add_argument('--no-tts-cache', action='store_true',
+                       help='Désactiver le cache disque des narrations synthétisées')
+    parser.add_argument('--no-segment-cache', action='store_true',
+                       help='Réencoder tous les segments (désactive le rendu incrémental de --renderer segments)')
+    parser.add_argument('--no-output-cache', action='store_true',
+                       help='Toujours refaire le rendu, même si une vidéo identique (même Markdown, mêmes options) existe')
+    parser.add_argument('--cache-dir', help='Dossier des caches persistants (défaut : ~/.cache/videoseul)')
     parser.add_argument('--verbose', '-v', action='store_true', help='Mode verbeux')
     parser.add_argument('--interactive', action='store_true', help='Mode interactif')
     parser.add_argument('--tesseract-path', help='Chemin vers Tesseract OCR', 
                        default=r"C:\Program Files\Tesseract-OCR\tesseract.exe")
     parser.add_argument('--figure-pages', nargs='+', type=int, help='Pages contenant des figures à extraire')
     
-    return parser.parse_args()
+    args = parser.parse_args(argv)
+    if not args.markdown_file and not args.batch:
+        parser.error("un fichier Markdown ou --batch est requis")
+    return args
 
 # === FONCTIONS COMPATIBLES AVEC LE SCRIPT PRINCIPAL ===
 
@@ -269,8 +407,9 @@ def configure_avatar(avatar_path):
             "H:/formation-main/avatar.mp4",
             "./avatar.mp4",
             "../avatar.mp4",
-            BASE_DIR / "avatar.mp4"
         ]
+        if BASE_DIR:
+            alternative_paths.append(BASE_DIR / "avatar.mp4")
         for alt_path in alternative_paths:
             if Path(alt_path).exists():
                 print(f"👤 Avatar alternatif trouvé: {alt_path}")
@@ -376,6 +515,8 @@ def enhance_content_with_ai(content, model_name="microsoft/phi-2"):
         return content
     
     try:
+        import ollama
+        
         prompt = f"""
 Améliorez ce contenu éducatif pour une présentation vidéo :
 
@@ -402,6 +543,65 @@ Veuillez :
         logging.error(f"Erreur amélioration IA: {e}")
         return content
 
+def parse_resolution(value):
+    """Convertit "1920x1080" en (largeur, hauteur), arrondies au pair (requis par yuv420p)
+
+    Utilisée comme type argparse : une valeur invalide produit une erreur d'usage, pas une trace.
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*[xX×]\s*(\d+)\s*', str(value))
+    if not match:
+        raise argparse.ArgumentTypeError(f"résolution invalide: {value} (format attendu: 1920x1080)")
+    width, height = int(match.group(1)), int(match.group(2))
+    if width < 16 or height < 16:
+        raise argparse.ArgumentTypeError(f"résolution trop petite: {value}")
+    return width - width % 2, height - height % 2
+
+def positive_int(value):
+    """Type argparse : entier strictement positif (fps, nombres de processus)"""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(f"entier attendu: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"doit être supérieur ou égal à 1: {value}")
+    return number
+
+def apply_encoding_profile(name=None, resolution=None, fps=None):
+    """Applique un profil d'encodage (résolution, fps, preset, CRF, tune) et met la mise en page à l'échelle"""
+    global WIDTH, HEIGHT, LAYOUT_SCALE, ENCODING_SETTINGS
+    global FONT_SIZE_TITLE, FONT_SIZE_TEXT, FONT_SIZE_TABLE, TEXT_MARGIN
+
+    name = name or DEFAULT_ENCODING_PROFILE
+    if name not in ENCODING_PROFILES:
+        raise ValueError(f"Profil d'encodage inconnu: {name} (disponibles: {', '.join(ENCODING_PROFILES)})")
+    profile = ENCODING_PROFILES[name]
+
+    if isinstance(resolution, str):
+        resolution = parse_resolution(resolution)
+    WIDTH, HEIGHT = resolution or profile["resolution"]
+    LAYOUT_SCALE = HEIGHT / BASE_HEIGHT
+    FONT_SIZE_TITLE = max(8, round(BASE_LAYOUT["FONT_SIZE_TITLE"] * LAYOUT_SCALE))
+    FONT_SIZE_TEXT = max(8, round(BASE_LAYOUT["FONT_SIZE_TEXT"] * LAYOUT_SCALE))
+    FONT_SIZE_TABLE = max(8, round(BASE_LAYOUT["FONT_SIZE_TABLE"] * LAYOUT_SCALE))
+    TEXT_MARGIN = round(BASE_LAYOUT["TEXT_MARGIN"] * LAYOUT_SCALE)
+
+    ENCODING_SETTINGS = dict(ENCODING_SETTINGS, profile=name, fps=fps or profile["fps"],
+                             preset=profile["preset"], crf=profile["crf"], tune=profile["tune"])
+    print(f"🎚️ Profil d'encodage {name}: {WIDTH}x{HEIGHT} @ {ENCODING_SETTINGS['fps']} i/s, "
+          f"preset {ENCODING_SETTINGS['preset']}, CRF {ENCODING_SETTINGS['crf']}")
+    return ENCODING_SETTINGS
+
+def video_codec_params():
+    """Paramètres ffmpeg supplémentaires du profil courant (CRF, tune)"""
+    params = ['-crf', str(ENCODING_SETTINGS["crf"])]
+    if ENCODING_SETTINGS.get("tune"):
+        params += ['-tune', ENCODING_SETTINGS["tune"]]
+    return params
+
+def px(value):
+    """Convertit une dimension de mise en page de référence (540 lignes) à la résolution courante"""
+    return int(round(value * LAYOUT_SCALE))
+
 def slugify(text):
     text = unicodedata.normalize("NFKD", text)
     text = text.encode("ascii", "ignore").decode("ascii")
@@ -423,11 +623,482 @@ def clean_text_for_display(text):
     
     return '\n'.join(formatted_lines)
 
+# Analyse Markdown en une passe : expressions compilées une fois, appliquées ligne par ligne
+MD_HEADING_RE = re.compile(r'(#{1,6})\s+(.*?)\s*#*\s*$')
+MD_LIST_ITEM_RE = re.compile(r'(?:[-*+•]|\d+[.)])\s+(.*)')
+MD_TABLE_SEPARATOR_RE = re.compile(r'\|?(?:\s*:?-+:?\s*\|)+\s*(?::?-+:?\s*)?')
+MD_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\(\s*([^)\s]+)[^)]*\)')
+MD_INLINE_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)|\*\*|__|[*`]')
+PAGE_LINE_RE = re.compile(r'(?:##\s*---\s*Page \d+\s*---|Page \d+[:.]*|\d+)\s*')
+PAGE_PREFIX_RE = re.compile(r'^Page \d+[:.]*\s*')
+PAGE_REF_RE = re.compile(r'\s*(?:\[Page \d+\]|\(Page \d+\))')
+# Terme isolé quel que soit son voisinage : parenthèse, barre, guillemet, tiret ou fin de ligne
+TECHNICAL_TERMS_RE = re.compile(
+    r'(?<!\w)(?=[acdfhjklmnrsx])(API|REST|JSON|XML|HTTPS?|SQL|NoSQL|AWS|Azure|Docker|Kubernetes'
+    r'|algorithm|function|class|method|database|framework|library)(?!\w)\.?', re.IGNORECASE)
+NARRATION_INTROS = {
+    "technical": "Nous allons maintenant expliquer {title}",
+    "educational": "Maintenant, nous allons étudier {title}",
+}
+
+def strip_inline_markdown(text):
+    """Retire l'emphase, le code en ligne et remplace les liens par leur libellé"""
+    if '*' not in text and '_' not in text and '`' not in text and '[' not in text:
+        return text
+    return MD_INLINE_RE.sub(lambda m: m.group(1) or '', text)
+
+def _spoken(text):
+    """Termine une phrase de narration par une ponctuation pour marquer la pause"""
+    return text if text.endswith(('.', '!', '?', ':', ';', '…')) else text + "."
+
+def _make_markdown_slide(title, kind, lines, images, announce, content_type):
+    """Construit le modèle d'un slide à partir d'un bloc Markdown déjà découpé"""
+    bullets = []
+    table = None
+    body = []
+
+    if kind == "table":
+        table = [[strip_inline_markdown(cell.strip()) for cell in line.strip('|').split('|')]
+                 for line in lines if not MD_TABLE_SEPARATOR_RE.fullmatch(line)]
+    else:
+        for line in lines:
+            item = MD_LIST_ITEM_RE.match(line)
+            if item:
+                bullets.append(strip_inline_markdown(item.group(1)))
+                body.append(f"• {bullets[-1]}")
+            elif bullets and kind == "list":
+                # Ligne de continuation d'une puce
+                bullets[-1] = f"{bullets[-1]} {strip_inline_markdown(line)}"
+                body[-1] = f"• {bullets[-1]}"
+            else:
+                body.append(strip_inline_markdown(line))
+
+    if title is None:
+        # Pas de titre de section : la première ligne d'un paragraphe sert de titre (comportement historique)
+        title = body.pop(0) if kind == "text" and body else ""
+        announce = True
+
+    spoken = []
+    if announce and title:
+        intro = NARRATION_INTROS.get(content_type)
+        spoken.append(_spoken(intro.format(title=title) if intro else title))
+    if table:
+        spoken.extend(_spoken(", ".join(cell for cell in row if cell)) for row in table if any(row))
+    else:
+        spoken.extend(_spoken(line.lstrip("• ")) for line in body if line)
+    narration = " ".join(spoken) or _spoken(title)
+    if content_type == "technical":
+        # Pause après les termes techniques
+        narration = TECHNICAL_TERMS_RE.sub(r'\1...', narration)
+
+    return {
+        "title": title,
+        "text": "\n".join(body),
+        "bullets": bullets,
+        "tables": [table] if table else [],
+        "images": list(images),
+        "narration": narration,
+        "duration": SLIDE_DUR,
+    }
+
+def iter_markdown_slides(source, skip_page_numbers=False, content_type="general"):
+    """Découpe le Markdown en slides typés (titre, puces, tableau, images, narration) en une seule passe
+
+    source : texte complet ou itérable de lignes (un fichier ouvert est lu au fil de l'eau).
+    Chaque titre ouvre une section ; chaque bloc séparé par une ligne vide donne un slide
+    portant le titre de sa section. Un tableau occupe toujours son propre slide ; au-delà de
+    TABLE_ROWS_PER_SLIDE lignes il se poursuit sur d'autres slides, en-tête répété.
+    """
+    lines = source.splitlines() if isinstance(source, str) else source
+    heading = None      # Titre de la section courante
+    announced = True    # Titre de section déjà lu dans une narration
+    kind = None         # Type du bloc courant : "text", "list" ou "table"
+    block = []
+    images = []
+
+    def flush():
+        nonlocal kind, announced
+        if not block and not images:
+            return []
+        chunks = [block]
+        if kind == "table":
+            rows = [line for line in block if not MD_TABLE_SEPARATOR_RE.fullmatch(line)]
+            chunks = [rows[:1] + rows[i:i + TABLE_ROWS_PER_SLIDE]
+                      for i in range(1, len(rows), TABLE_ROWS_PER_SLIDE)] or [rows]
+        slides = [_make_markdown_slide(heading, kind, chunk, images if i == 0 else [],
+                                       not announced and i == 0, content_type)
+                  for i, chunk in enumerate(chunks)]
+        announced = True
+        kind = None
+        block.clear()
+        images.clear()
+        return slides
+
+    for raw in lines:
+        line = raw.strip()
+        if skip_page_numbers and line:
+            if PAGE_LINE_RE.fullmatch(line):
+                continue
+            if 'Page' in line:
+                line = PAGE_REF_RE.sub('', PAGE_PREFIX_RE.sub('', line, count=1)).strip()
+                if not line:
+                    continue
+
+        if not line:
+            yield from flush()
+            continue
+
+        if line[0] == '#':
+            match = MD_HEADING_RE.fullmatch(line)
+            if match:
+                slides = flush()
+                yield from slides
+                if not slides and not announced:
+                    # Section sans contenu : slide de titre seul
+                    yield _make_markdown_slide(heading, None, [], [], True, content_type)
+                heading = strip_inline_markdown(match.group(2))
+                announced = False
+                continue
+
+        if '![' in line:
+            images.extend(m.group(2) for m in MD_IMAGE_RE.finditer(line))
+            line = MD_IMAGE_RE.sub('', line).strip()
+            if not line:
+                continue
+
+        if line[0] == '|':
+            line_kind = "table"
+        elif MD_LIST_ITEM_RE.match(line):
+            line_kind = "list"
+        else:
+            line_kind = "text"
+        if kind is None:
+            kind = line_kind
+        elif kind != line_kind and "table" in (kind, line_kind):
+            yield from flush()
+            kind = line_kind
+        block.append(line)
+
+    slides = flush()
+    yield from slides
+    if not slides and not announced:
+        yield _make_markdown_slide(heading, None, [], [], True, content_type)
+
+def parse_markdown_slides(source, skip_page_numbers=False, content_type="general"):
+    """Retourne la liste des slides typés d'un document Markdown (voir iter_markdown_slides)"""
+    return list(iter_markdown_slides(source, skip_page_numbers, content_type))
+
+@lru_cache(maxsize=None)
+def get_font(fontsize):
+    """Charge (une seule fois par taille) la première police TrueType disponible"""
+    for candidate in FONT_CANDIDATES:
+        if not candidate:
+            continue
+        try:
+            return ImageFont.truetype(candidate, fontsize)
+        except OSError:
+            continue
+    print("⚠️ Aucune police TrueType trouvée, utilisation de la police par défaut de Pillow")
+    return ImageFont.load_default(fontsize)
+
+@lru_cache(maxsize=65536)
+def text_width(text, fontsize):
+    """Largeur en pixels d'un mot ou d'une ligne (métriques mises en cache)"""
+    return get_font(fontsize).getlength(text)
+
+def wrap_text(text, fontsize, width):
+    """Découpe le texte en lignes tenant dans la largeur donnée (équivalent du mode caption)"""
+    space = text_width(" ", fontsize)
+    lines = []
+    for paragraph in text.split('\n'):
+        current, current_width = "", 0
+        for word in paragraph.split(' '):
+            word_width = text_width(word, fontsize)
+            if current and current_width + space + word_width > width:
+                lines.append(current)
+                current, current_width = word, word_width
+            elif current:
+                current, current_width = f"{current} {word}", current_width + space + word_width
+            else:
+                current, current_width = word, word_width
+        lines.append(current)
+    return lines
+
+@lru_cache(maxsize=TEXT_BLOCK_CACHE_SIZE)
+def render_text_block(text, fontsize, width, align="West", color=TEXT_COLOR):
+    """Rasterise un bloc de texte en image RGBA (numpy, lecture seule), mis en cache par (texte, taille, largeur, alignement)"""
+    font = get_font(fontsize)
+    lines = wrap_text(text, fontsize, width)
+    ascent, descent = font.getmetrics()
+    line_height = ascent + descent + int(round(TEXT_INTERLINE))
+
+    image = Image.new("RGBA", (width, max(1, line_height * len(lines))), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        line_width = text_width(line, fontsize)
+        if align == "center":
+            x = (width - line_width) / 2
+        elif align == "East":
+            x = width - line_width
+        else:
+            x = 0
+        draw.text((x, i * line_height), line, font=font, fill=color)
+
+    block = np.array(image)
+    block.flags.writeable = False
+    return block
+
+def blit_rgba(frame, image, x, y):
+    """Colle une image RGB/RGBA sur une frame RGB en place (alpha blending vectorisé)"""
+    frame_h, frame_w = frame.shape[:2]
+    x0, y0 = max(int(x), 0), max(int(y), 0)
+    x1 = min(int(x) + image.shape[1], frame_w)
+    y1 = min(int(y) + image.shape[0], frame_h)
+    if x1 <= x0 or y1 <= y0:
+        return frame
+
+    src = image[y0 - int(y):y1 - int(y), x0 - int(x):x1 - int(x)]
+    region = frame[y0:y1, x0:x1]
+    if src.shape[2] == 3:
+        region[:] = src
+    else:
+        alpha = src[..., 3:4].astype(np.uint16)
+        region[:] = ((src[..., :3] * alpha + region * (255 - alpha) + 127) // 255).astype(np.uint8)
+    return frame
+
+def render_table(rows, width, max_height):
+    """Rasterise un tableau (première ligne = en-tête) en image RGB numpy
+
+    Fonds, lignes zébrées et bordures sont peints par découpage de tableaux sur une image
+    préallouée ; le texte des cellules passe par render_text_block (mis en cache).
+    La taille de police est réduite si le tableau dépasse max_height.
+    """
+    n_cols = max(len(row) for row in rows)
+    rows = [list(row) + [""] * (n_cols - len(row)) for row in rows]
+    min_size = max(8, px(MIN_FONT_SIZE_TABLE))
+    pad_ratio = TABLE_CELL_PADDING / BASE_LAYOUT["FONT_SIZE_TABLE"]
+
+    # Première estimation de la police à partir de la hauteur disponible par ligne
+    per_row = max_height / len(rows) - 1
+    fontsize = max(min_size, min(FONT_SIZE_TABLE, int(per_row / (1.2 + 2 * pad_ratio))))
+
+    while True:
+        pad = max(2, round(fontsize * pad_ratio))
+        natural = [max(text_width(row[c], fontsize) for row in rows) + 2 * pad + 1 for c in range(n_cols)]
+        total = sum(natural)
+        if total > width:
+            # Colonnes réduites proportionnellement (le texte des cellules est alors replié)
+            col_widths = [max(2 * pad + fontsize, int(width * w / total)) for w in natural]
+        else:
+            col_widths = [int(np.ceil(w)) for w in natural]
+        blocks = [[render_text_block(cell, fontsize, col_widths[c] - 2 * pad - 1) if cell else None
+                   for c, cell in enumerate(row)] for row in rows]
+        line_height = sum(get_font(fontsize).getmetrics())
+        row_heights = [max([b.shape[0] for b in row if b is not None] or [line_height]) + 2 * pad + 1
+                       for row in blocks]
+        if sum(row_heights) < max_height or fontsize <= min_size:
+            break
+        fontsize = max(min_size, int(fontsize * 0.85))
+
+    heights = np.array(row_heights)
+    y_edges = np.concatenate(([0], np.cumsum(heights)))
+    x_edges = np.concatenate(([0], np.cumsum(col_widths)))
+    image = np.empty((y_edges[-1] + 1, x_edges[-1] + 1, 3), dtype=np.uint8)
+
+    # Fonds : en-tête puis lignes zébrées, une couleur par ligne de pixels
+    palette = np.array([TABLE_HEADER_BG, TABLE_ROW_BG_1, TABLE_ROW_BG_2], dtype=np.uint8)
+    row_index = np.arange(len(rows))
+    row_colors = np.where(row_index == 0, 0, 1 + (row_index - 1) % 2)
+    image[:-1] = palette[np.repeat(row_colors, heights)][:, None, :]
+
+    # Bordures horizontales et verticales
+    image[y_edges] = TABLE_BORDER
+    image[:, x_edges] = TABLE_BORDER
+
+    for r, row in enumerate(blocks):
+        for c, block in enumerate(row):
+            if block is not None:
+                blit_rgba(image, block, x_edges[c] + pad + 1, y_edges[r] + pad + 1)
+    return image
+
+class AssetCache:
+    """Cache LRU borné en mémoire des images décodées et redimensionnées (numpy, lecture seule)"""
+
+    def __init__(self, max_bytes=ASSET_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, width=None, height=None):
+        """Retourne l'image décodée à la taille cible (largeur, hauteur ou boîte englobante)"""
+        path = Path(path)
+        key = (str(path.resolve()), path.stat().st_mtime_ns, width, height)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        array = self._decode(path, width, height)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = array
+                self.current_bytes += array.nbytes
+                # Éviction LRU tant que le budget mémoire est dépassé
+                while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.current_bytes -= evicted.nbytes
+            return self._entries[key]
+
+    @staticmethod
+    def _decode(path, width=None, height=None):
+        """Décode une image et la redimensionne une seule fois"""
+        with Image.open(path) as image:
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            if width and height:
+                # Boîte englobante : on conserve les proportions
+                scale = min(width / image.width, height / image.height)
+                size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            elif width:
+                size = (width, max(1, round(image.height * width / image.width)))
+            elif height:
+                size = (max(1, round(image.width * height / image.height)), height)
+            else:
+                size = image.size
+            if image.format == "JPEG" and size[0] < image.width:
+                # Décodage JPEG directement à une échelle réduite (1/2, 1/4, 1/8)
+                image.draft("RGB", size)
+            image = image.convert("RGBA" if has_alpha else "RGB")
+            if size != image.size:
+                image = image.resize(size, Image.LANCZOS)
+            array = np.array(image)
+        array.flags.writeable = False
+        return array
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+ASSET_CACHE = AssetCache()
+
+def load_image_asset(path, width=None, height=None):
+    """Charge une image via le cache d'assets partagé"""
+    return ASSET_CACHE.get(path, width, height)
+
+def slide_layout(title, has_body, image_count):
+    """Zones d'un slide : haut du contenu, largeur du texte et boîtes (x, y, largeur, hauteur) des images"""
+    content_top = px(80) if title else px(40)
+    content_width = WIDTH - 2 * TEXT_MARGIN
+    if not image_count:
+        return content_top, content_width, []
+
+    # Les images sont opaques : elles commencent sous les jambages du titre
+    image_top = content_top + (px(15) if title else 0)
+    area_height = HEIGHT - px(20) - image_top
+    gap = px(10)
+
+    if has_body:
+        # Texte à gauche, images empilées dans une colonne à droite
+        column = int(content_width * IMAGE_COLUMN_RATIO)
+        body_width = content_width - column - px(20)
+        left = TEXT_MARGIN + body_width + px(20)
+        box_h = (area_height - gap * (image_count - 1)) // image_count
+        boxes = [(left, image_top + i * (box_h + gap), column, box_h) for i in range(image_count)]
+    else:
+        # Slide d'images : côte à côte sur toute la largeur
+        body_width = content_width
+        box_w = (content_width - gap * (image_count - 1)) // image_count
+        boxes = [(TEXT_MARGIN + i * (box_w + gap), image_top, box_w, area_height) for i in range(image_count)]
+    return content_top, body_width, boxes
+
+def resolve_image_path(reference, base_dir=None):
+    """Retrouve le fichier d'une image référencée dans le Markdown (relatif au document, sinon par nom)"""
+    base_dir = Path(base_dir or BASE_DIR or Path.cwd())
+    reference = Path(reference.replace('\\', '/'))
+    candidates = [reference] if reference.is_absolute() else [base_dir / reference]
+    if INPUT_MD:
+        # Dossier d'images du convertisseur : <nom du document>/<image>
+        candidates.append(base_dir / INPUT_MD.stem / reference.name)
+    candidates.append(base_dir / reference.name)
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    return None
+
+def prepare_slide_images(slides, base_dir=None, workers=IMAGE_DECODE_WORKERS):
+    """Pré-passe images : résout les références puis décode et réduit chaque image à sa boîte, en parallèle
+
+    Les images sont réduites une seule fois à leur taille d'affichage dans le cache d'assets ;
+    slide["images"] est remplacé par les chemins résolus, les images introuvables sont ignorées.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    jobs = []
+    missing = 0
+    for slide in slides:
+        references = slide.get("images") or []
+        if not references:
+            continue
+        resolved = []
+        for reference in references:
+            path = resolve_image_path(reference, base_dir)
+            if path is None:
+                print(f"⚠️ Image introuvable: {reference}")
+                missing += 1
+            else:
+                resolved.append(str(path))
+        slide["images"] = resolved
+        has_body = bool(slide.get("text") or slide.get("tables"))
+        _, _, boxes = slide_layout(slide.get("title"), has_body, len(resolved))
+        jobs.extend((slide, path, box[2], box[3]) for path, box in zip(resolved, boxes))
+
+    if not jobs:
+        return slides
+
+    def decode(job):
+        slide, path, width, height = job
+        try:
+            load_image_asset(path, width, height)
+            return None
+        except Exception as e:
+            print(f"⚠️ Image illisible {path}: {e}")
+            return job
+
+    start = time.time()
+    # Pillow libère le GIL pendant le décodage et le redimensionnement
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        failures = [job for job in pool.map(decode, jobs) if job is not None]
+    for slide, path, _, _ in failures:
+        slide["images"] = [p for p in slide["images"] if p != path]
+
+    print(f"🖼️ {len(jobs) - len(failures)} image(s) préparée(s) en {time.time() - start:.2f} s"
+          + (f" ({missing + len(failures)} ignorée(s))" if missing or failures else ""))
+    return slides
+
+@lru_cache(maxsize=None)
+def configure_imagemagick():
+    """Applique le chemin ImageMagick Windows (moteur de texte "imagemagick" uniquement)"""
+    if os.name == "nt" and Path(IMAGEMAGICK_BINARY).exists():
+        from moviepy.config import change_settings
+        change_settings({"IMAGEMAGICK_BINARY": IMAGEMAGICK_BINARY})
+
 def create_text_clip(text, fontsize, width, position, align="West", duration=SLIDE_DUR):
     """Crée un TextClip MoviePy propre avec fallback"""
     if not text or not text.strip():
         text = " "
 
+    from moviepy.video.VideoClip import ImageClip, TextClip
+
+    if TEXT_RENDERER == "pillow":
+        return ImageClip(render_text_block(text, fontsize, width, align)).set_position(position).set_duration(duration)
+
+    configure_imagemagick()
     try:
         clip = TextClip(
             text,
@@ -436,7 +1107,7 @@ def create_text_clip(text, fontsize, width, position, align="West", duration=SLI
             method="caption",
             align=align,
             size=(width, None),
-            interline=1.2
+            interline=TEXT_INTERLINE
         )
         return clip.set_position(position).set_duration(duration)
     except Exception as e:
@@ -446,39 +1117,1479 @@ def create_text_clip(text, fontsize, width, position, align="West", duration=SLI
             method="caption", size=(width, None)
         ).set_position(position).set_duration(duration)
 
-def slide_clip(title, text_content, images=None, tables=None, duration=SLIDE_DUR, animate_text=False):
-    """Crée un slide simple compatible"""
+def build_slide_layers(title, text_content, images=None, tables=None, duration=SLIDE_DUR, has_body=None):
+    """Construit les calques MoviePy d'un slide (fond, titre, texte, tableaux, images, logo)"""
+    from moviepy.video.VideoClip import ColorClip, ImageClip
+    
     bg = ColorClip((WIDTH, HEIGHT), color=BG_COLOR).set_duration(duration)
     layers = [bg]
 
-    content_top = 80 if title else 40
+    images = images or []
+    if has_body is None:
+        has_body = bool(text_content or tables)
+    content_top, body_width, image_boxes = slide_layout(title, has_body, len(images))
     
     # Titre
     if title:
-        title_clip = create_text_clip(title, FONT_SIZE_TITLE, WIDTH-120, 
-                                     position=("center", 30), 
+        title_clip = create_text_clip(title, FONT_SIZE_TITLE, WIDTH - px(120), 
+                                     position=("center", px(30)), 
                                      align="center", duration=duration)
         layers.append(title_clip)
     
     # Texte principal
     if text_content:
-        clean_text = re.sub(r'!\[.*?\]\(.*?\)', '', text_content)
-        clean_text = clean_text_for_display(clean_text)
-        
-        text_clip = create_text_clip(clean_text, FONT_SIZE_TEXT, WIDTH - 2*TEXT_MARGIN, 
+        text_clip = create_text_clip(text_content, FONT_SIZE_TEXT, body_width, 
                                    position=(TEXT_MARGIN, content_top), 
                                    duration=duration)
         layers.append(text_clip)
+        content_top += text_clip.h + px(20)
+
+    # Tableaux
+    for rows in tables or []:
+        table = render_table(rows, body_width, HEIGHT - content_top - px(20))
+        layers.append(ImageClip(table).set_position((TEXT_MARGIN + (body_width - table.shape[1]) // 2, content_top))
+                      .set_duration(duration))
+        content_top += table.shape[0] + px(20)
+
+    # Images (déjà réduites à leur boîte par prepare_slide_images)
+    for path, (x, y, box_w, box_h) in zip(images, image_boxes):
+        image = load_image_asset(path, box_w, box_h)
+        layers.append(ImageClip(image).set_position((x + (box_w - image.shape[1]) // 2, y))
+                      .set_duration(duration))
 
     # Logo
     if LOGO_PATH and LOGO_PATH.exists():
-        logo = ImageClip(str(LOGO_PATH)).resize(width=70).set_position((WIDTH-80, 20)).set_duration(duration)
+        logo = ImageClip(load_image_asset(LOGO_PATH, width=px(70))).set_position((WIDTH - px(80), px(20))).set_duration(duration)
         layers.append(logo)
 
+    return layers
+
+def render_slide_frame(title, text_content, images=None, tables=None, has_body=None):
+    """Aplatit un slide statique en une seule image RGB (HEIGHT, WIDTH, 3)
+
+    has_body : force la mise en page avec ou sans corps (images en colonne ou pleine largeur) ;
+    par défaut, déduite du texte et des tableaux fournis.
+    """
+    if TEXT_RENDERER != "pillow":
+        from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+        layers = build_slide_layers(title, text_content, images, tables, duration=1, has_body=has_body)
+        composite = CompositeVideoClip(layers, size=(WIDTH, HEIGHT))
+        try:
+            return composite.get_frame(0)
+        finally:
+            composite.close()
+            for layer in layers:
+                layer.close()
+
+    # Rendu direct en numpy : fond, titre, texte, tableaux, images puis logo
+    frame = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    frame[:] = BG_COLOR
+
+    images = images or []
+    if has_body is None:
+        has_body = bool(text_content or tables)
+    content_top, body_width, image_boxes = slide_layout(title, has_body, len(images))
+
+    if title:
+        block = render_text_block(title, FONT_SIZE_TITLE, WIDTH - px(120), "center")
+        blit_rgba(frame, block, (WIDTH - block.shape[1]) // 2, px(30))
+
+    if text_content and text_content.strip():
+        block = render_text_block(text_content, FONT_SIZE_TEXT, body_width)
+        blit_rgba(frame, block, TEXT_MARGIN, content_top)
+        content_top += block.shape[0] + px(20)
+
+    for rows in tables or []:
+        table = render_table(rows, body_width, HEIGHT - content_top - px(20))
+        blit_rgba(frame, table, TEXT_MARGIN + (body_width - table.shape[1]) // 2, content_top)
+        content_top += table.shape[0] + px(20)
+
+    for path, (x, y, box_w, box_h) in zip(images, image_boxes):
+        image = load_image_asset(path, box_w, box_h)
+        blit_rgba(frame, image, x + (box_w - image.shape[1]) // 2, y)
+
+    if LOGO_PATH and LOGO_PATH.exists():
+        blit_rgba(frame, load_image_asset(LOGO_PATH, width=px(70)), WIDTH - px(80), px(20))
+
+    return frame
+
+def iter_animation_frames(title, text_content, images, tables, frame_count):
+    """Animation d'apparition du corps d'un slide, rendue en mémoire : produit des paires (image, répétitions)
+
+    Le texte et les tableaux sont dévoilés de haut en bas pendant ANIMATION_DURATION secondes, en
+    ANIMATION_FRAMES étapes, par interpolation alpha vectorisée entre deux images aplaties (sans corps /
+    complète). Seule la bande qui change est recalculée dans des tampons réutilisés : chaque image
+    produite doit être consommée (ou copiée) avant l'itération suivante. Les étapes identiques
+    consécutives sont fusionnées et la fin du slide reste l'image complète.
+    """
+    full = np.ascontiguousarray(render_slide_frame(title, text_content, images, tables))
+    # Même mise en page que le slide complet : seuls le texte et les tableaux sont retirés
+    base = render_slide_frame(title, "", images, None, has_body=bool(text_content or tables))
+    changed = np.flatnonzero((base != full).any(axis=(1, 2)))
+    anim_count = min(frame_count, int(round(ANIMATION_DURATION * ENCODING_SETTINGS["fps"])))
+    if not changed.size or anim_count <= 0:
+        yield full, frame_count
+        return
+
+    top, bottom = int(changed[0]), int(changed[-1]) + 1
+    soft = max(1, px(24))  # Hauteur du dégradé du bord de dévoilement
+    steps = max(1, min(ANIMATION_FRAMES, anim_count))
+    rows = np.arange(top, bottom, dtype=np.float32)[:, None, None]
+    base_band = base[top:bottom].astype(np.float32)
+    delta = full[top:bottom].astype(np.float32) - base_band
+    work = np.empty_like(delta)
+    buffers = [full.copy(), full.copy()]
+
+    dump_dir = None
+    if DUMP_ANIMATION_FRAMES:
+        ensure_paths()
+        dump_dir = ANIMATION_DIR
+        dump_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1(f"{title}\n{text_content}".encode('utf-8')).hexdigest()[:8]
+        dump_name = f"anim_{slugify(title or 'slide')[:40]}_{digest}"
+
+    pending, repeat, emitted = None, 0, 0
+    for step in range(1, steps + 1):
+        hold = anim_count * step // steps - anim_count * (step - 1) // steps
+        # Le tampon en attente n'est jamais écrasé avant d'avoir été émis
+        frame = buffers[1] if pending is buffers[0] else buffers[0]
+        reveal = top + (bottom - top + soft) * step / steps
+        alpha = np.clip((reveal - rows) / soft, 0.0, 1.0)
+        np.multiply(delta, alpha, out=work)
+        work += base_band
+        work += 0.5
+        np.copyto(frame[top:bottom], work, casting='unsafe')
+
+        if pending is not None and np.array_equal(frame[top:bottom], pending[top:bottom]):
+            repeat += hold
+            continue
+        if pending is not None:
+            yield pending, repeat
+        if dump_dir is not None:
+            Image.fromarray(frame).save(dump_dir / f"{dump_name}_frame_{emitted:04d}.png")
+        emitted += 1
+        pending, repeat = frame, hold
+
+    # La dernière étape est l'image complète : elle couvre aussi le reste du slide
+    yield pending, repeat + frame_count - anim_count
+
+def slide_entry_frame(slide):
+    """Première image d'un slide (sans son corps s'il est animé) : cible du fondu qui le précède"""
+    if slide.get("animate"):
+        return render_slide_frame(slide["title"], "", slide.get("images"), None,
+                                  has_body=bool(slide.get("text") or slide.get("tables")))
+    return render_slide_frame(slide["title"], slide["text"], slide.get("images"), slide.get("tables"))
+
+def link_slide_transitions(slides):
+    """Associe à chaque slide le slide suivant, vers lequel ses dernières images fondent"""
+    for current, following in zip(slides, slides[1:]):
+        current["transition_to"] = {k: following.get(k) for k in ("title", "text", "images", "tables", "animate")}
+    return slides
+
+def transition_frame_count(frame_count):
+    """Nombre d'images du fondu (TRANSITION_DUR x fps), limité à la moitié du slide"""
+    return min(int(round(TRANSITION_DUR * ENCODING_SETTINGS["fps"])), frame_count // 2)
+
+def iter_transition_frames(frame_a, frame_b, count):
+    """Fondu enchaîné de frame_a vers frame_b : interpolation alpha vectorisée en virgule fixe
+
+    Les calculs se font dans des tampons réutilisés : chaque image produite doit être consommée
+    (ou copiée) avant l'itération suivante.
+    """
+    start = frame_a.astype(np.uint16)
+    end = frame_b.astype(np.uint16)
+    work = np.empty_like(start)
+    scratch = np.empty_like(start)
+    frame = np.empty(frame_a.shape, dtype=np.uint8)
+    for i in range(1, count + 1):
+        weight = (256 * i) // (count + 1)
+        np.multiply(end, weight, out=work)
+        np.multiply(start, 256 - weight, out=scratch)
+        work += scratch
+        work >>= 8
+        np.copyto(frame, work, casting='unsafe')
+        yield frame
+
+def transition_clip(frame_a, frame_b, count):
+    """Clip MoviePy du fondu : seules les images de la fenêtre de transition sont calculées"""
+    from moviepy.video.VideoClip import VideoClip
+
+    fps = ENCODING_SETTINGS["fps"]
+    state = {"index": None, "frames": None, "frame": None}
+
+    def make_frame(t):
+        index = min(int(t * fps + 1e-6), count - 1)
+        if state["index"] is None or index <= state["index"]:
+            # Lecture séquentielle attendue ; retour en arrière : on relance le fondu
+            state["frames"] = iter_transition_frames(frame_a, frame_b, count)
+            state["index"] = -1
+        while state["index"] < index:
+            state["frame"] = next(state["frames"])
+            state["index"] += 1
+        return state["frame"]
+
+    return VideoClip(make_frame, duration=count / fps)
+
+def animated_slide_clip(title, text_content, images=None, tables=None, duration=SLIDE_DUR):
+    """Clip MoviePy d'un slide animé : étapes calculées à la demande, comme les fondus (transition_clip)
+
+    Aucune image n'est conservée entre deux rendus : les tampons de iter_animation_frames n'existent
+    que pendant la lecture du slide et sont libérés à sa dernière image. La mémoire d'un deck animé
+    ne dépend ni du nombre de slides ni du nombre d'étapes.
+    """
+    from moviepy.video.VideoClip import VideoClip
+
+    fps = ENCODING_SETTINGS["fps"]
+    frame_count = max(1, int(round(duration * fps)))
+    state = {}
+
+    def reset():
+        state.update(runs=None, frame=None, start=0, end=0)
+
+    def make_frame(t):
+        index = min(int(t * fps + 1e-6), frame_count - 1)
+        if state["runs"] is None or index < state["start"]:
+            # Lecture séquentielle attendue ; retour en arrière : on relance l'animation
+            reset()
+            state["runs"] = iter_animation_frames(title, text_content, images, tables, frame_count)
+        while index >= state["end"]:
+            frame, repeat = next(state["runs"])
+            state.update(frame=frame, start=state["end"], end=state["end"] + repeat)
+        frame = state["frame"]
+        if index == frame_count - 1:
+            reset()  # Slide terminé : tampons libérés
+        return frame
+
+    reset()
+    clip = VideoClip(make_frame, duration=duration)
+    reset()  # VideoClip lit l'image 0 pour connaître sa taille : rien ne reste en mémoire avant le rendu
+    return clip
+
+def slide_clip(title, text_content, images=None, tables=None, duration=SLIDE_DUR, animate_text=False,
+               transition_to=None):
+    """Crée un slide simple compatible (transition_to : slide suivant, pour le fondu enchaîné final)"""
+    from moviepy.video.VideoClip import ImageClip
+    from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+    
+    if transition_to and STATIC_SLIDES:
+        from moviepy.video.compositing.concatenate import concatenate_videoclips
+
+        fps = ENCODING_SETTINGS["fps"]
+        count = transition_frame_count(int(round(duration * fps)))
+        if count:
+            body = slide_clip(title, text_content, images, tables, duration - count / fps, animate_text)
+            last = np.ascontiguousarray(render_slide_frame(title, text_content, images, tables))
+            fade = transition_clip(last, slide_entry_frame(transition_to), count)
+            return concatenate_videoclips([body, fade])
+
+    if animate_text and STATIC_SLIDES:
+        return animated_slide_clip(title, text_content, images, tables, duration)
+
+    if STATIC_SLIDES:
+        # Chemin rapide : une seule composition par slide au lieu de fps x durée
+        frame = render_slide_frame(title, text_content, images, tables)
+        return ImageClip(frame).set_duration(duration)
+
+    layers = build_slide_layers(title, text_content, images, tables, duration)
     return CompositeVideoClip(layers, size=(WIDTH, HEIGHT))
 
-def create_enhanced_presentation(content, output_video_path=None, model_name="microsoft/phi-2"):
-    """Crée une présentation simple compatible avec l'interface PyQt5"""
+class DiskCache:
+    """Cache disque adressé par contenu, avec éviction LRU sur la taille totale"""
+
+    suffix = ".bin"
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def hash_payload(payload):
+        """Hash stable d'une structure JSON"""
+        data = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def get(self, key):
+        """Retourne le chemin de l'entrée en cache (et la marque comme récente) ou None"""
+        path = self.path_for(key)
+        if path.exists():
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.hits += 1
+            return path
+        self.misses += 1
+        return None
+
+    def put_file(self, key, source_path):
+        """Déplace un fichier produit dans le cache (remplacement atomique)"""
+        path = self.path_for(key)
+        if path.exists():
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        shutil.move(str(source_path), tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def evict(self, keep=()):
+        """Supprime les entrées les moins récemment utilisées au-delà de la taille maximale"""
+        keep = {str(Path(p)) for p in keep}
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob(f"*/*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if str(path) in keep:
+                continue
+            try:
+                path.unlink()
+                total -= size
+                self.evictions += 1
+            except OSError:
+                pass
+        return total
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+class TTSCache(DiskCache):
+    """Cache disque des narrations WAV, adressé par hash(texte, voix, débit, moteur)"""
+
+    suffix = ".wav"
+
+    def __init__(self, cache_dir, max_bytes=TTS_CACHE_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+    @classmethod
+    def make_key(cls, text, voice, rate, engine_name):
+        """Clé de cache : hash du texte et des paramètres de synthèse"""
+        return cls.hash_payload([text, voice, rate, engine_name])
+
+    def put(self, key, pcm, rate):
+        """Enregistre un audio synthétisé dans le cache (écriture atomique)"""
+        path = self.path_for(key)
+        if path.exists():
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        write_wav_pcm(tmp_path, pcm, rate)
+        os.replace(tmp_path, path)
+        return path
+
+class SegmentCache(DiskCache):
+    """Cache disque des segments vidéo encodés, adressé par hash des entrées de rendu du segment"""
+
+    suffix = ".mp4"
+
+    def __init__(self, cache_dir, max_bytes=SEGMENT_CACHE_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+class OutputCache(DiskCache):
+    """Cache disque des vidéos finales, adressé par hash(Markdown, fichiers référencés, options, version du rendu)"""
+
+    suffix = ".mp4"
+
+    def __init__(self, cache_dir, max_bytes=OUTPUT_CACHE_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+    def put_link(self, key, source_path):
+        """Enregistre une vidéo produite par lien physique (copie si le cache est sur un autre disque)"""
+        path = self.path_for(key)
+        if path.exists():
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        link_or_copy(source_path, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+def link_or_copy(source, target):
+    """Lien physique de source vers target, copie en repli (autre disque, système de fichiers sans liens)"""
+    try:
+        os.link(source, target)
+        return "link"
+    except OSError:
+        shutil.copyfile(source, target)
+        return "copy"
+
+TTS_CACHE = TTSCache(CACHE_ROOT / "tts")
+SEGMENT_CACHE = SegmentCache(CACHE_ROOT / "segments")
+OUTPUT_CACHE = OutputCache(CACHE_ROOT / "outputs")
+
+def file_signature(path):
+    """Identité d'un fichier pour les clés de cache : chemin, date de modification, taille"""
+    path = Path(path)
+    if not path.exists():
+        return [str(path), None]
+    stat = path.stat()
+    return [str(path), stat.st_mtime_ns, stat.st_size]
+
+def render_layout_payload():
+    """Paramètres de mise en page et d'encodage communs aux clés de cache des segments et des vidéos"""
+    return {
+        "layout": {
+            "size": [WIDTH, HEIGHT],
+            "fonts": [FONT_SIZE_TITLE, FONT_SIZE_TEXT, FONT_SIZE_TABLE, TEXT_INTERLINE],
+            "font_file": getattr(get_font(FONT_SIZE_TEXT), "path", None),
+            "colors": [BG_COLOR, TEXT_COLOR, TABLE_HEADER_BG, TABLE_ROW_BG_1, TABLE_ROW_BG_2, TABLE_BORDER],
+            "margin": TEXT_MARGIN,
+            "scale": LAYOUT_SCALE,
+            "animation": [ANIMATION_FRAMES, ANIMATION_DURATION],
+            "transition": TRANSITION_DUR,
+        },
+        "static": STATIC_SLIDES,
+        "text_renderer": TEXT_RENDERER,
+        "encoding": ENCODING_SETTINGS,
+    }
+
+def segment_cache_key(slides):
+    """Hash de toutes les entrées de rendu d'un segment (contenu, mise en page, encodage)"""
+    logo = None
+    if LOGO_PATH and LOGO_PATH.exists():
+        logo = [str(LOGO_PATH), LOGO_PATH.stat().st_mtime_ns]
+    return DiskCache.hash_payload({
+        "version": RENDER_CACHE_VERSION,
+        "slides": [{k: slide.get(k) for k in ("title", "text", "images", "tables", "duration", "animate", "transition_to")}
+                   for slide in slides],
+        "logo": logo,
+        "image_files": [[path, Path(path).stat().st_mtime_ns if Path(path).exists() else None]
+                        for slide in slides for path in slide.get("images") or []],
+        **render_layout_payload(),
+    })
+
+def output_cache_key(content, content_type="general"):
+    """Hash de tout ce qui détermine la vidéo finale : Markdown, images, logo, avatar, narration et options"""
+    images = [resolve_image_path(reference) for _, reference in MD_IMAGE_RE.findall(content)]
+    return DiskCache.hash_payload({
+        "version": RENDER_CACHE_VERSION,
+        "content": hashlib.sha256(content.encode('utf-8')).hexdigest(),
+        "content_type": content_type,
+        "images": [file_signature(path) for path in images if path is not None],
+        "logo": file_signature(LOGO_PATH) if LOGO_PATH else None,
+        "avatar": [file_signature(AVATAR_PATH), AVATAR_CORNER, AVATAR_WIDTH_RATIO] if AVATAR_PATH else None,
+        "slides": [SKIP_PAGE_NUMBERS, ANIMATE_TEXT, TRANSITIONS_ENABLED, INTRO_DUR, OUTRO_DUR, SLIDE_DUR,
+                   MIN_SLIDE_DUR, NARRATION_PADDING, TABLE_ROWS_PER_SLIDE],
+        "tts": [TTS_BACKEND_NAME, TTS_VOICE, TTS_RATE],
+        "renderer": RENDER_MODE,
+        **render_layout_payload(),
+    })
+
+def get_ffmpeg_binary():
+    """Retourne le binaire ffmpeg utilisé par MoviePy"""
+    from moviepy.config import get_setting
+    return get_setting("FFMPEG_BINARY")
+
+def _worker_settings():
+    """Réglages globaux à propager aux processus de rendu"""
+    return {
+        "LOGO_PATH": LOGO_PATH,
+        "STATIC_SLIDES": STATIC_SLIDES,
+        "TEXT_RENDERER": TEXT_RENDERER,
+        "WIDTH": WIDTH,
+        "HEIGHT": HEIGHT,
+        "LAYOUT_SCALE": LAYOUT_SCALE,
+        "FONT_SIZE_TITLE": FONT_SIZE_TITLE,
+        "FONT_SIZE_TEXT": FONT_SIZE_TEXT,
+        "FONT_SIZE_TABLE": FONT_SIZE_TABLE,
+        "TEXT_MARGIN": TEXT_MARGIN,
+        "ENCODING_SETTINGS": ENCODING_SETTINGS,
+        "ANIMATION_DIR": ANIMATION_DIR,
+        "DUMP_ANIMATION_FRAMES": DUMP_ANIMATION_FRAMES,
+    }
+
+def _init_segment_worker(settings):
+    """Initialise l'état global d'un processus d'encodage de segments"""
+    globals().update(settings)
+
+def encode_segment(slides, segment_path):
+    """Encode un groupe de slides dans un segment vidéo sans audio
+
+    Les images passent par le même flux brut que le rendu "stream" : le segment contient exactement
+    round(durée x fps) images, sans l'image de trop que write_videofile ajoute selon l'arrondi
+    flottant, qui décalerait la vidéo de la narration au fil des segments concaténés.
+    """
+    write_slide_frames(slides, segment_path)
+    return str(segment_path)
+
+def concat_segments(segment_paths, output_path, narration=None):
+    """Concatène les segments avec le demuxer concat de ffmpeg (sans réencodage) et multiplexe la narration
+
+    narration : (PCM int16 (échantillons, canaux), fréquence), envoyée sur l'entrée standard et encodée une fois en AAC.
+    """
+    output_path = Path(output_path)
+    list_file = output_path.with_suffix('.segments.txt')
+    with open(list_file, 'w', encoding='utf-8') as f:
+        for segment_path in segment_paths:
+            escaped = str(Path(segment_path).resolve()).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    cmd = [get_ffmpeg_binary(), '-y', '-loglevel', 'error',
+           '-f', 'concat', '-safe', '0', '-i', str(list_file)]
+    if narration is not None:
+        cmd += [*pcm_input_args(narration), '-map', '0:v', '-map', '1:a',
+                '-c:v', 'copy', '-c:a', ENCODING_SETTINGS["audio_codec"], *narration_output_args(narration)]
+    else:
+        cmd += ['-c', 'copy']
+    cmd.append(str(output_path))
+
+    try:
+        result = subprocess.run(cmd, input=pcm_bytes(narration), capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg concat a échoué: {result.stderr.decode('utf-8', 'ignore').strip()}")
+    finally:
+        try:
+            list_file.unlink()
+        except OSError:
+            pass
+    return str(output_path)
+
+def overlay_avatar(video_path, avatar_path, corner=None):
+    """Incruste l'avatar en une seule passe ffmpeg : mise à l'échelle unique, lecture en boucle, overlay dans un coin
+
+    La piste audio de la vidéo est copiée telle quelle ; seule la vidéo est réencodée une fois.
+    """
+    video_path = Path(video_path)
+    temp_path = video_path.with_name(f"{video_path.stem}.avatar{video_path.suffix}")
+    width = 2 * round(WIDTH * AVATAR_WIDTH_RATIO / 2)
+    x, y = (pos.format(m=px(20)) for pos in AVATAR_OVERLAY_POSITIONS[corner or AVATAR_CORNER])
+    filter_graph = (f"[1:v]fps={ENCODING_SETTINGS['fps']},scale={width}:-2,setsar=1[avatar];"
+                    f"[0:v][avatar]overlay={x}:{y}:shortest=1[video]")
+
+    cmd = [get_ffmpeg_binary(), '-y', '-loglevel', 'error',
+           '-i', str(video_path),
+           '-stream_loop', '-1', '-i', str(avatar_path),
+           '-filter_complex', filter_graph,
+           '-map', '[video]', '-map', '0:a?',
+           '-c:v', ENCODING_SETTINGS["codec"], '-preset', ENCODING_SETTINGS["preset"],
+           '-crf', str(ENCODING_SETTINGS["crf"]), '-pix_fmt', 'yuv420p',
+           '-c:a', 'copy', str(temp_path)]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        try:
+            temp_path.unlink()
+        except OSError:
+            pass
+        raise RuntimeError(f"ffmpeg overlay a échoué: {result.stderr.strip()}")
+    os.replace(temp_path, video_path)
+    return str(video_path)
+
+def render_segments_parallel(slides, output_path, narration=None, workers=None, slides_per_segment=None, stats=None):
+    """Encode les slides en segments dans un pool de processus puis les assemble (segments inchangés réutilisés)"""
+    output_path = Path(output_path)
+    workers = workers or SEGMENT_WORKERS
+    group_size = max(1, slides_per_segment or SLIDES_PER_SEGMENT)
+    groups = [slides[i:i + group_size] for i in range(0, len(slides), group_size)]
+    cache = SEGMENT_CACHE if SEGMENT_CACHE_ENABLED else None
+
+    segment_dir = output_path.parent / f"{output_path.stem}_segments"
+    segment_dir.mkdir(parents=True, exist_ok=True)
+
+    # Seuls les segments absents du cache sont encodés
+    segment_paths = []
+    jobs = []
+    for i, group in enumerate(groups):
+        key = segment_cache_key(group) if cache else None
+        cached = cache.get(key) if cache else None
+        if cached:
+            segment_paths.append(cached)
+            continue
+        path = segment_dir / f"segment_{i:04d}.mp4"
+        segment_paths.append(path)
+        jobs.append((i, group, path, key))
+
+    try:
+        start = time.perf_counter()
+        if jobs:
+            print(f"🧩 Encodage de {len(jobs)}/{len(groups)} segments sur {min(workers, len(jobs))} processus...")
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                     initializer=_init_segment_worker,
+                                     initargs=(_worker_settings(),)) as pool:
+                list(pool.map(encode_segment, [job[1] for job in jobs], [job[2] for job in jobs]))
+        if cache:
+            for i, _, path, key in jobs:
+                segment_paths[i] = cache.put_file(key, path)
+            print(f"♻️ Segments réutilisés: {len(groups) - len(jobs)}/{len(groups)}")
+
+        encode_time = time.perf_counter() - start
+
+        print("🔗 Concaténation des segments (sans réencodage)...")
+        start = time.perf_counter()
+        result = concat_segments(segment_paths, output_path, narration)
+        if stats is not None:
+            fps = ENCODING_SETTINGS["fps"]
+            encoded = sum(slide["duration"] for _, group, _, _ in jobs for slide in group)
+            stats.update(frames=int(round(encoded * fps)),
+                         segments_encoded=len(jobs), segments_reused=len(groups) - len(jobs),
+                         encode_s=round(encode_time, 3), mux_s=round(time.perf_counter() - start, 3))
+        return result
+    finally:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+        if cache:
+            cache.evict(keep=segment_paths)
+
+def report_progress(stage, fraction, message=""):
+    """Transmet l'avancement du rendu à PROGRESS_CALLBACK ; une erreur du suivi n'interrompt pas le rendu"""
+    if PROGRESS_CALLBACK is None:
+        return
+    try:
+        PROGRESS_CALLBACK(stage, round(min(1.0, max(0.0, fraction)), 3), message)
+    except Exception as e:
+        print(f"⚠️ Suivi d'avancement indisponible: {e}")
+
+# Pic de mémoire résidente effacé par les remises à zéro de VmHWM (RenderReport.stage), en octets :
+# sous Linux ru_maxrss suit VmHWM et repartirait lui aussi de zéro
+PEAK_RSS_BEFORE_RESET = 0
+RSS_SAMPLE_INTERVAL = 0.01  # Secondes entre deux échantillons quand VmHWM n'est pas disponible
+
+def get_peak_rss():
+    """Pic de mémoire résidente en octets depuis le démarrage : (processus courant, sous-processus) ou (None, None)
+
+    Valeurs cumulées sur toute la vie du processus : dans un processus batch ou de service
+    gardé chaud, elles incluent les travaux précédents.
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows : psutil si disponible
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset, None
+        except (ImportError, AttributeError):
+            return None, None
+    # ru_maxrss est en Ko sous Linux et en octets sous macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    return (max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit, PEAK_RSS_BEFORE_RESET),
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit)
+
+def get_current_rss():
+    """Mémoire résidente actuelle du processus en octets (None si indisponible)"""
+    try:
+        # Linux : deuxième champ de /proc/self/statm, en pages
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+def read_hwm_rss():
+    """Pic de mémoire résidente depuis la dernière remise à zéro (VmHWM, Linux), en octets ou None"""
+    try:
+        with open("/proc/self/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def reset_hwm_rss():
+    """Ramène VmHWM à la mémoire actuelle (5 écrit dans /proc/self/clear_refs, Linux 4.0+)
+
+    Renvoie le pic effacé, toujours compté par get_peak_rss, ou None si la remise à zéro est impossible.
+    """
+    global PEAK_RSS_BEFORE_RESET
+    peak = read_hwm_rss()
+    if peak is None:
+        return None
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return None
+    PEAK_RSS_BEFORE_RESET = max(PEAK_RSS_BEFORE_RESET, peak)
+    return peak
+
+class RSSSampler:
+    """Relève la mémoire résidente dans un thread jusqu'à stop() (repli quand VmHWM est indisponible)"""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL):
+        self.peak = get_current_rss() or 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self, interval):
+        while not self._stopped.wait(interval):
+            self.peak = max(self.peak, get_current_rss() or 0)
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        return self.peak
+
+class RenderReport:
+    """Étapes d'un rendu : temps réel, temps CPU (processus et sous-processus), mémoire, images et octets
+
+    Mémoire par étape : résidente à la sortie, variation pendant l'étape et pic de l'étape. Le pic vient
+    de VmHWM remis à zéro à l'entrée de l'étape (Linux), sinon d'un thread d'échantillonnage, sinon
+    des seules mesures d'entrée et de sortie. Le pic du processus n'est donné qu'une fois,
+    dans "total", et couvre toute la vie du processus.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self._open_peaks = []  # Pics en cours des étapes englobantes (étapes imbriquées)
+        self.info = {}
+        self.started = time.perf_counter()
+        self.cpu_started = self._cpu_times()
+
+    @staticmethod
+    def _cpu_times():
+        # Les sous-processus (ffmpeg, pools) ne sont comptés qu'une fois terminés
+        times = os.times()
+        return times.user + times.system, times.children_user + times.children_system
+
+    @contextmanager
+    def stage(self, name):
+        """Mesure le bloc ; le dictionnaire rendu accepte des compteurs (frames, bytes, ...)"""
+        span = {"stage": name, "frames": 0, "bytes": 0}
+        start = time.perf_counter()
+        cpu, children_cpu = self._cpu_times()
+        rss = get_current_rss()
+        peak = {"rss": rss or 0}
+        sampler = None
+        cleared = reset_hwm_rss()
+        if cleared is not None:
+            # Le pic effacé appartient encore aux étapes englobantes
+            for outer in self._open_peaks:
+                outer["rss"] = max(outer["rss"], cleared)
+        elif rss:
+            try:
+                sampler = RSSSampler()
+            except RuntimeError:
+                pass  # Plus de thread disponible : pic estimé à l'entrée et à la sortie
+        self._open_peaks.append(peak)
+        try:
+            yield span
+        finally:
+            self._open_peaks.remove(peak)
+            end_cpu, end_children_cpu = self._cpu_times()
+            end_rss = get_current_rss()
+            if cleared is not None:
+                peak["rss"] = max(peak["rss"], read_hwm_rss() or 0)
+            elif sampler is not None:
+                peak["rss"] = max(peak["rss"], sampler.stop())
+            peak["rss"] = max(peak["rss"], end_rss or 0)
+            span["wall_s"] = round(time.perf_counter() - start, 3)
+            span["cpu_s"] = round(end_cpu - cpu, 3)
+            span["children_cpu_s"] = round(end_children_cpu - children_cpu, 3)
+            span["rss_mb"] = round(end_rss / (1024 * 1024), 1) if end_rss else None
+            span["rss_delta_mb"] = round((end_rss - rss) / (1024 * 1024), 1) if rss and end_rss else None
+            span["peak_rss_mb"] = round(peak["rss"] / (1024 * 1024), 1) if peak["rss"] else None
+            self.stages.append(span)
+
+    def to_dict(self):
+        cpu, children_cpu = self._cpu_times()
+        peak_rss, peak_children_rss = get_peak_rss()
+        return {
+            **self.info,
+            "total": {
+                "wall_s": round(time.perf_counter() - self.started, 3),
+                "cpu_s": round(cpu - self.cpu_started[0], 3),
+                "children_cpu_s": round(children_cpu - self.cpu_started[1], 3),
+                # Pics cumulés depuis le démarrage du processus (travaux précédents compris)
+                "process_peak_rss_mb": round(peak_rss / (1024 * 1024), 1) if peak_rss else None,
+                "process_peak_children_rss_mb": (round(peak_children_rss / (1024 * 1024), 1)
+                                                 if peak_children_rss else None),
+                "frames": sum(span["frames"] for span in self.stages),
+                "bytes": sum(span["bytes"] for span in self.stages),
+            },
+            "stages": self.stages,
+        }
+
+    def save(self, path):
+        """Écrit le rapport JSON (à côté de la vidéo)"""
+        path = Path(path)
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding='utf-8')
+        return path
+
+    def summary(self):
+        return " | ".join(f"{span['stage']} {span['wall_s']:.2f} s" for span in self.stages)
+
+def pcm_input_args(narration):
+    """Arguments ffmpeg d'une entrée PCM int16 brute lue sur l'entrée standard"""
+    pcm, rate = narration
+    return ['-f', 's16le', '-ar', str(rate), '-ac', str(pcm.shape[1]), '-i', 'pipe:0']
+
+def narration_output_args(narration):
+    """Durée de sortie fixée par la piste de narration (déjà à la longueur de la timeline)
+
+    Pas de -shortest : un flux AAC qui finit quelques échantillons avant la vidéo ferait perdre
+    la dernière image ; l'audio est complété par du silence (apad) et la sortie coupée à la timeline.
+    """
+    pcm, rate = narration
+    return ['-af', 'apad', '-t', f"{len(pcm) / rate:.6f}"]
+
+def pcm_bytes(narration):
+    """Octets little-endian du PCM à envoyer à ffmpeg (None sans narration)"""
+    if narration is None:
+        return None
+    pcm = narration[0]
+    return np.ascontiguousarray(pcm, dtype='<i2').tobytes()
+
+def mux_narration(video_path, narration, output_path):
+    """Multiplexe la vidéo (copiée sans réencodage) et la narration en mémoire, encodée une seule fois en AAC"""
+    cmd = [get_ffmpeg_binary(), '-y', '-loglevel', 'error', '-i', str(video_path), *pcm_input_args(narration),
+           '-map', '0:v', '-map', '1:a', '-c:v', 'copy', '-c:a', ENCODING_SETTINGS["audio_codec"],
+           *narration_output_args(narration), str(output_path)]
+    result = subprocess.run(cmd, input=pcm_bytes(narration), capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg (narration) a échoué: {result.stderr.decode('utf-8', 'ignore').strip()}")
+    return str(output_path)
+
+def open_ffmpeg_writer(output_path, stderr=None):
+    """Lance ffmpeg en lecture d'images RGB brutes sur son entrée standard"""
+    cmd = [get_ffmpeg_binary(), '-y', '-loglevel', 'error',
+           '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{WIDTH}x{HEIGHT}',
+           '-r', str(ENCODING_SETTINGS["fps"]), '-i', '-']
+    cmd += ['-c:v', ENCODING_SETTINGS["codec"], '-preset', ENCODING_SETTINGS["preset"],
+            *video_codec_params(), '-pix_fmt', 'yuv420p', str(output_path)]
+    return subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=stderr)
+
+def iter_slide_frames(slide, frame_count):
+    """Produit les images d'un slide une par une (image fixe répétée pour un slide statique)
+
+    Avec un slide suivant (slide["transition_to"]), les dernières images sont un fondu enchaîné
+    calculé entre l'image finale de ce slide et la première du suivant.
+    """
+    count = transition_frame_count(frame_count) if STATIC_SLIDES and slide.get("transition_to") else 0
+    last = None
+    for frame in _iter_slide_body_frames(slide, frame_count - count):
+        last = frame
+        yield frame
+    if count:
+        if last is None:
+            last = render_slide_frame(slide["title"], slide["text"], slide.get("images"), slide.get("tables"))
+        yield from iter_transition_frames(last, slide_entry_frame(slide["transition_to"]), count)
+
+def _iter_slide_body_frames(slide, frame_count):
+    """Images propres d'un slide (fixes, animées ou recomposées), hors transition"""
+    if STATIC_SLIDES and slide.get("animate"):
+        # Étapes d'animation dédupliquées : chaque image distincte est répétée sans recalcul
+        for frame, repeat in iter_animation_frames(slide["title"], slide["text"], slide.get("images"),
+                                                   slide.get("tables"), frame_count):
+            for _ in range(repeat):
+                yield frame
+        return
+
+    if STATIC_SLIDES:
+        frame = np.ascontiguousarray(render_slide_frame(slide["title"], slide["text"],
+                                                        slide.get("images"), slide.get("tables")))
+        for _ in range(frame_count):
+            yield frame
+        return
+
+    clip = slide_clip(slide["title"], slide["text"], slide.get("images"), slide.get("tables"),
+                      duration=slide["duration"])
+    try:
+        fps = ENCODING_SETTINGS["fps"]
+        for i in range(frame_count):
+            yield clip.get_frame(min(i / fps, clip.duration))
+    finally:
+        clip.close()
+
+def write_slide_frames(slides, video_path, timings=None, on_slide=None):
+    """Écrit les images des slides dans ffmpeg (entrée standard) et retourne le nombre d'images envoyées
+
+    Le nombre d'images est calculé sur le temps cumulé : round(durée totale x fps), sans dérive.
+    timings : dict complété par rasterize_s / encode_wait_s ; on_slide(i) est appelé après chaque slide.
+    """
+    fps = ENCODING_SETTINGS["fps"]
+    frames_written = 0
+    elapsed = 0.0
+    raster_time = 0.0  # Composition des images
+    write_time = 0.0   # Attente de ffmpeg (encodage) sur le tube
+
+    with tempfile.TemporaryFile() as ffmpeg_log:
+        process = open_ffmpeg_writer(video_path, stderr=ffmpeg_log)
+        completed = False
+        try:
+            try:
+                for i, slide in enumerate(slides):
+                    # Nombre d'images calculé sur le temps cumulé pour éviter toute dérive
+                    elapsed += slide["duration"]
+                    frame_count = int(round(elapsed * fps)) - frames_written
+                    frames = iter_slide_frames(slide, frame_count)
+                    while True:
+                        start = time.perf_counter()
+                        frame = next(frames, None)
+                        raster_time += time.perf_counter() - start
+                        if frame is None:
+                            break
+                        start = time.perf_counter()
+                        process.stdin.write(frame.tobytes() if not frame.flags.c_contiguous else frame.data)
+                        write_time += time.perf_counter() - start
+                    frames_written += frame_count
+                    if on_slide:
+                        on_slide(i)
+                process.stdin.close()
+            except BrokenPipeError:
+                pass  # ffmpeg s'est arrêté : son code de retour et son journal expliquent l'erreur
+            returncode = process.wait()
+            if returncode != 0:
+                ffmpeg_log.seek(0)
+                raise RuntimeError(f"ffmpeg a échoué: {ffmpeg_log.read().decode('utf-8', 'ignore').strip()}")
+            completed = True
+        finally:
+            if not completed:
+                # Échec pendant le rendu : pas de ffmpeg orphelin ni de vidéo partielle (processus batch/service)
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+                process.kill()
+                process.wait()
+                Path(video_path).unlink(missing_ok=True)
+
+    if timings is not None:
+        timings.update(rasterize_s=round(raster_time, 3), encode_wait_s=round(write_time, 3))
+    return frames_written
+
+def render_slides_streaming(slides, output_path, narration=None, stats=None):
+    """Envoie les images slide par slide dans ffmpeg : la mémoire ne dépend pas de la longueur du document
+
+    L'entrée standard de ffmpeg porte les images : la narration en mémoire est multiplexée ensuite (copie vidéo).
+    """
+    output_path = Path(output_path)
+    video_path = output_path.with_name(f"{output_path.stem}.video{output_path.suffix}") if narration else output_path
+    timings = {}
+
+    def on_slide(i):
+        report_progress("render", 0.4 + 0.5 * (i + 1) / len(slides), f"slide {i + 1}/{len(slides)}")
+
+    frames_written = write_slide_frames(slides, video_path, timings, on_slide)
+    print(f"🎞️ {frames_written} images envoyées à ffmpeg en flux")
+    if narration is not None:
+        start = time.perf_counter()
+        try:
+            mux_narration(video_path, narration, output_path)
+        finally:
+            video_path.unlink(missing_ok=True)
+        if stats is not None:
+            stats["mux_s"] = round(time.perf_counter() - start, 3)
+    if stats is not None:
+        stats.update(frames=frames_written, **timings)
+    return str(output_path)
+
+def get_wav_duration(path):
+    """Durée en secondes d'un fichier WAV (lecture de l'en-tête uniquement)"""
+    with wave.open(str(path), 'rb') as wav:
+        return wav.getnframes() / float(wav.getframerate())
+
+def read_wav_pcm(source):
+    """Lit un WAV PCM 16 bits (chemin ou octets) en tableau int16 (échantillons, canaux) + fréquence"""
+    data = source if isinstance(source, (bytes, bytearray)) else Path(source).read_bytes()
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError("flux WAV invalide")
+
+    # Parcours des chunks : les flux produits sur stdout ont souvent des tailles d'en-tête fictives
+    channels = rate = bits = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, chunk_size = data[pos:pos + 4], int.from_bytes(data[pos + 4:pos + 8], 'little')
+        body = pos + 8
+        if chunk_id == b'fmt ':
+            channels = int.from_bytes(data[body + 2:body + 4], 'little')
+            rate = int.from_bytes(data[body + 4:body + 8], 'little')
+            bits = int.from_bytes(data[body + 14:body + 16], 'little')
+        elif chunk_id == b'data':
+            if bits != 16:
+                raise ValueError(f"format PCM non supporté ({bits} bits)")
+            payload = data[body:min(body + chunk_size, len(data))]
+            payload = payload[:len(payload) - len(payload) % (2 * channels)]
+            return np.frombuffer(payload, dtype='<i2').reshape(-1, channels), rate
+        pos = body + chunk_size + (chunk_size & 1)
+    raise ValueError("chunk data absent du flux WAV")
+
+def write_wav_pcm(path, pcm, rate):
+    """Écrit un tableau int16 (échantillons, canaux) dans un fichier WAV"""
+    pcm = np.asarray(pcm, dtype=np.int16).reshape(len(pcm), -1)
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(pcm.shape[1])
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.astype('<i2').tobytes())
+    return str(path)
+
+class TTSBackend:
+    """Interface des moteurs de synthèse hors ligne : texte -> (PCM int16, fréquence)"""
+
+    name = "base"
+
+    def __init__(self, rate=TTS_RATE, voice=None):
+        self.rate = rate
+        self.voice = voice
+
+    def synthesize(self, text):
+        """Retourne (tableau int16 (échantillons, canaux), fréquence d'échantillonnage)"""
+        raise NotImplementedError
+
+    def synthesize_many(self, texts):
+        """Synthétise plusieurs textes, dans l'ordre"""
+        return [self.synthesize(text) for text in texts]
+
+    def stream(self, text):
+        """Produit l'audio par morceaux (un seul morceau pour les moteurs non incrémentaux)"""
+        yield self.synthesize(text)
+
+    def cache_params(self):
+        """Paramètres qui influencent le rendu audio (clé du cache TTS)"""
+        return self.voice, self.rate
+
+    def close(self):
+        pass
+
+class Pyttsx3Backend(TTSBackend):
+    """Moteur pyttsx3 (SAPI5 sous Windows, espeak sous Linux), sortie via fichier WAV temporaire"""
+
+    name = "pyttsx3"
+
+    def __init__(self, rate=TTS_RATE, voice=None):
+        super().__init__(rate, voice)
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self.finished = {}
+        self.engine.connect('finished-utterance', self._on_finished)
+        self.engine.setProperty('rate', rate)
+        if voice:
+            self.engine.setProperty('voice', voice)
+
+    def synthesize(self, text):
+        return self.synthesize_many([text])[0]
+
+    def _on_finished(self, name, completed):
+        self.finished[name] = completed
+
+    def synthesize_many(self, texts):
+        # Une seule boucle runAndWait pour tout le lot ; chaque énoncé signale sa fin (finished-utterance)
+        self.finished = {}
+        with tempfile.TemporaryDirectory(prefix="videoseul_tts_") as tmp_dir:
+            paths = [Path(tmp_dir) / f"{i:04d}.wav" for i in range(len(texts))]
+            for i, (text, path) in enumerate(zip(texts, paths)):
+                self.engine.save_to_file(text, str(path), f"{i:04d}")
+            self.engine.runAndWait()
+            return [self._read_output(path, self.finished.get(path.stem)) for path in paths]
+
+    def _read_output(self, path, completed):
+        """Lit le WAV d'un énoncé ; s'il est signalé terminé, attend que le pilote ait fini de l'écrire"""
+        deadline = time.monotonic() + PYTTSX3_FLUSH_TIMEOUT
+        while True:
+            try:
+                return read_wav_pcm(path)
+            except (OSError, ValueError):
+                # Certains pilotes (SAPI5) ferment le fichier juste après l'événement de fin
+                if not completed or time.monotonic() > deadline:
+                    return None
+            time.sleep(0.01)
+
+class EspeakNGBackend(TTSBackend):
+    """Moteur espeak-ng en ligne de commande, WAV lu directement sur stdout"""
+
+    name = "espeak-ng"
+
+    def __init__(self, rate=TTS_RATE, voice=None, binary=None):
+        super().__init__(rate, voice or "fr")
+        self.binary = binary or shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.binary:
+            raise RuntimeError("espeak-ng introuvable dans le PATH")
+
+    def _command(self):
+        return [self.binary, "-v", self.voice, "-s", str(self.rate), "--stdout", "--stdin"]
+
+    def synthesize(self, text):
+        result = subprocess.run(self._command(), input=text.encode('utf-8'), capture_output=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"espeak-ng a échoué: {result.stderr.decode('utf-8', 'ignore').strip()}")
+        return read_wav_pcm(result.stdout)
+
+    def stream(self, text):
+        # Lecture incrémentale de stdout : permet de mesurer la latence du premier échantillon
+        process = subprocess.Popen(self._command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL)
+        process.stdin.write(text.encode('utf-8'))
+        process.stdin.close()
+        buffer = b""
+        channels = rate = None
+        try:
+            while True:
+                chunk = process.stdout.read1(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                if rate is None:
+                    data_pos = buffer.find(b"data")
+                    if data_pos < 0 or len(buffer) < data_pos + 8:
+                        continue
+                    channels = int.from_bytes(buffer[22:24], 'little')
+                    rate = int.from_bytes(buffer[24:28], 'little')
+                    buffer = buffer[data_pos + 8:]
+                # Les octets d'un échantillon incomplet sont gardés pour le morceau suivant
+                usable = len(buffer) - len(buffer) % (2 * channels)
+                if usable:
+                    yield np.frombuffer(buffer[:usable], dtype='<i2').reshape(-1, channels), rate
+                    buffer = buffer[usable:]
+        finally:
+            process.stdout.close()
+            process.wait()
+
+TTS_BACKENDS = {
+    Pyttsx3Backend.name: Pyttsx3Backend,
+    EspeakNGBackend.name: EspeakNGBackend,
+}
+
+def get_tts_backend(name=None, rate=None, voice=None):
+    """Instancie un moteur de synthèse par son nom"""
+    name = name or TTS_BACKEND_NAME
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"Moteur TTS inconnu: {name} (disponibles: {', '.join(TTS_BACKENDS)})")
+    return TTS_BACKENDS[name](rate=rate or TTS_RATE, voice=voice or TTS_VOICE)
+
+def _init_tts_worker(backend_name, rate, voice):
+    """Crée le moteur TTS propre à un processus de synthèse"""
+    global TTS_WORKER_BACKEND
+    TTS_WORKER_BACKEND = get_tts_backend(backend_name, rate, voice)
+
+def _tts_worker_synthesize(texts):
+    """Synthétise un lot de textes dans un processus du pool"""
+    try:
+        return TTS_WORKER_BACKEND.synthesize_many(texts)
+    except Exception as e:
+        print(f"⚠️ Erreur de synthèse ({TTS_WORKER_BACKEND.name}): {e}")
+        return [None] * len(texts)
+
+def synthesize_texts(texts, backend=None, workers=None):
+    """Synthétise une liste de textes ; les résultats (PCM, fréquence) sont rendus dans l'ordre"""
+    workers = min(workers or TTS_WORKERS, len(texts))
+    if workers <= 1:
+        backend = backend or get_tts_backend()
+        return backend.synthesize_many(texts)
+
+    # Un lot contigu par processus pour amortir le démarrage de chaque moteur
+    batch_size = math.ceil(len(texts) / workers)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    name = backend.name if backend else TTS_BACKEND_NAME
+    rate = backend.rate if backend else TTS_RATE
+    voice = backend.voice if backend else TTS_VOICE
+
+    # "spawn" : chaque processus initialise un moteur neuf au lieu d'hériter de celui du parent
+    print(f"🗣️ Synthèse répartie sur {len(batches)} processus...")
+    with ProcessPoolExecutor(max_workers=len(batches),
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_tts_worker,
+                             initargs=(name, rate, voice)) as pool:
+        return [result for batch in pool.map(_tts_worker_synthesize, batches) for result in batch]
+
+def synthesize_slide_narrations(slides, tts_cache=None, backend=None):
+    """Synthétise une narration par slide et fixe la durée de chaque slide sur celle de son audio
+
+    Avec le cache, slide["audio_path"] désigne le WAV du cache ; sans cache, le PCM reste
+    en mémoire dans slide["audio_pcm"] (aucun fichier intermédiaire).
+    """
+    if tts_cache is None and TTS_CACHE_ENABLED:
+        tts_cache = TTS_CACHE
+
+    # Seuls les textes absents du cache sont synthétisés
+    if backend is not None:
+        backend_name, (voice, rate) = backend.name, backend.cache_params()
+    else:
+        backend_name, voice, rate = TTS_BACKEND_NAME, TTS_VOICE, TTS_RATE
+    pending = {}
+    for slide in slides:
+        slide["audio_path"] = None
+        slide.pop("audio_pcm", None)
+        text = slide.get("narration", "").strip()
+        if not text:
+            continue
+        key = TTSCache.make_key(text, voice, rate, backend_name)
+        slide["tts_key"] = key
+        cached = tts_cache.get(key) if tts_cache else None
+        if cached:
+            slide["audio_path"] = str(cached)
+        elif key not in pending:
+            pending[key] = text
+
+    synthesized = {}
+    if pending:
+        results = synthesize_texts(list(pending.values()), backend)
+        for key, result in zip(pending, results):
+            if result is None:
+                continue
+            pcm, sample_rate = result
+            synthesized[key] = str(tts_cache.put(key, pcm, sample_rate)) if tts_cache else result
+
+    for i, slide in enumerate(slides):
+        key = slide.get("tts_key")
+        if key in pending:
+            if key not in synthesized:
+                print(f"⚠️ Narration manquante pour le slide {i+1}, durée par défaut conservée")
+                continue
+            if isinstance(synthesized[key], str):
+                slide["audio_path"] = synthesized[key]
+            else:
+                slide["audio_pcm"] = synthesized[key]
+        if slide.get("audio_pcm") is not None:
+            pcm, sample_rate = slide["audio_pcm"]
+            audio_duration = len(pcm) / float(sample_rate)
+        elif not slide["audio_path"]:
+            continue
+        else:
+            try:
+                audio_duration = get_wav_duration(slide["audio_path"])
+            except (wave.Error, EOFError) as e:
+                print(f"⚠️ Narration illisible pour le slide {i+1}: {e}")
+                slide["audio_path"] = None
+                continue
+        slide["audio_duration"] = audio_duration
+        # Durée arrondie à l'image près pour que les segments restent alignés sur la timeline
+        fps = ENCODING_SETTINGS["fps"]
+        slide["duration"] = math.ceil(max(MIN_SLIDE_DUR, audio_duration + NARRATION_PADDING) * fps) / fps
+
+    if tts_cache:
+        tts_cache.evict(keep=[s["audio_path"] for s in slides if s.get("audio_path")])
+        print(f"🗃️ Cache TTS: {len(pending)} narration(s) synthétisée(s), "
+              f"{len([s for s in slides if s.get('tts_key')]) - len(pending)} réutilisée(s)")
+
+    return slides
+
+def build_timeline(slides):
+    """Construit la timeline : début et fin de chaque slide dans la vidéo finale"""
+    timeline = []
+    start = 0.0
+    for i, slide in enumerate(slides):
+        end = start + slide["duration"]
+        timeline.append({
+            "index": i,
+            "title": slide["title"],
+            "start": start,
+            "end": end,
+            "duration": slide["duration"],
+            "audio_path": slide.get("audio_path"),
+            "audio_pcm": slide.get("audio_pcm"),
+        })
+        start = end
+    return timeline
+
+def assemble_narration_track(timeline):
+    """Assemble les narrations par slide en une seule piste PCM en mémoire, alignée sur la timeline
+
+    Retourne (PCM int16 (échantillons, canaux), fréquence) ou None si aucune narration n'est disponible.
+    """
+    segments = []
+    for entry in timeline:
+        if entry.get("audio_pcm") is not None:
+            segments.append((entry, *entry["audio_pcm"]))
+            continue
+        if not entry["audio_path"]:
+            continue
+        try:
+            segments.append((entry, *read_wav_pcm(entry["audio_path"])))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Narration ignorée pour le slide {entry['index']+1}: {e}")
+    if not segments:
+        return None
+
+    _, first_pcm, rate = segments[0]
+    channels = first_pcm.shape[1]
+    total = int(round(timeline[-1]["end"] * rate))
+    track = np.zeros((total, channels), dtype=np.int16)
+
+    for entry, samples, sample_rate in segments:
+        if sample_rate != rate:
+            # Rééchantillonnage linéaire vers la fréquence de la piste
+            positions = np.arange(0, len(samples), sample_rate / rate)
+            samples = np.stack([np.interp(positions, np.arange(len(samples)), samples[:, c])
+                                for c in range(samples.shape[1])], axis=1).astype(np.int16)
+        if samples.shape[1] != channels:
+            samples = np.repeat(samples[:, :1], channels, axis=1)
+        offset = int(round(entry["start"] * rate))
+        length = min(len(samples), total - offset)
+        track[offset:offset + length] = samples[:length]
+
+    return track, rate
+
+HTML_DECK_TEMPLATE = """<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+  body {{ margin: 0; background: #222; font-family: Arial, "DejaVu Sans", sans-serif; }}
+  .slide {{ display: none; position: relative; box-sizing: border-box; width: min(100vw, 177.78vh);
+            aspect-ratio: 16 / 9; margin: 0 auto; padding: 3% 4%; background: rgb{bg}; color: {color};
+            overflow: hidden; }}
+  .slide.active {{ display: block; }}
+  .slide h1 {{ margin: 0 8% 2% 0; font-size: 4.6vmin; }}
+  .slide .body {{ display: flex; gap: 3%; font-size: 3.2vmin; }}
+  .slide .text {{ flex: 1; }}
+  .slide .images {{ flex: 0 0 {image_ratio}%; display: flex; flex-direction: column; gap: 1vmin; }}
+  .slide .images:only-child {{ flex: 1; align-items: center; }}
+  .slide .images img {{ max-width: 100%; max-height: 60vmin; object-fit: contain; }}
+  .slide table {{ border-collapse: collapse; font-size: 2.6vmin; }}
+  .slide th, .slide td {{ border: 1px solid rgb{border}; padding: 0.6vmin 1.2vmin; text-align: left; }}
+  .slide th {{ background: rgb{header}; }}
+  .slide tr:nth-child(even) td {{ background: rgb{row}; }}
+  .slide .logo {{ position: absolute; top: 3%; right: 2%; width: 7%; }}
+  nav {{ display: flex; justify-content: center; gap: 1em; padding: 0.8em; color: #eee; }}
+  nav button {{ font-size: 1em; }}
+</style>
+</head>
+<body>
+{slides}
+<nav><button id="prev">◀</button><span id="position"></span><button id="play">▶ Lecture</button><button id="next">▶</button></nav>
+<audio id="narration" preload="none"></audio>
+<script type="application/json" id="timeline">{timeline}</script>
+<script>
+  const timeline = JSON.parse(document.getElementById("timeline").textContent).slides;
+  const slides = document.querySelectorAll(".slide");
+  const audio = document.getElementById("narration");
+  let current = 0, playing = false, timer = null;
+  function show(index) {{
+    current = Math.max(0, Math.min(slides.length - 1, index));
+    slides.forEach((slide, i) => slide.classList.toggle("active", i === current));
+    document.getElementById("position").textContent = (current + 1) + " / " + slides.length;
+    clearTimeout(timer);
+    audio.pause();
+    if (!playing) return;
+    const entry = timeline[current];
+    const advance = () => {{ if (current < slides.length - 1) show(current + 1); else playing = false; }};
+    if (entry.audio) {{ audio.src = entry.audio; audio.play(); audio.onended = () => {{ timer = setTimeout(advance, {padding_ms}); }}; }}
+    else {{ timer = setTimeout(advance, entry.duration * 1000); }}
+  }}
+  document.getElementById("prev").onclick = () => show(current - 1);
+  document.getElementById("next").onclick = () => show(current + 1);
+  document.getElementById("play").onclick = () => {{ playing = !playing; show(current); }};
+  document.addEventListener("keydown", (e) => {{
+    if (e.key === "ArrowRight") show(current + 1);
+    if (e.key === "ArrowLeft") show(current - 1);
+  }});
+  show(0);
+</script>
+</body>
+</html>
+"""
+
+def slide_html(slide, image_names, logo_name=None):
+    """Convertit un slide du modèle commun en section HTML (texte, puces, tableaux, images)"""
+    import html
+
+    body = []
+    items = []
+    for line in (slide.get("text") or "").split("\n"):
+        if line.startswith("• "):
+            items.append(f"<li>{html.escape(line[2:])}</li>")
+            continue
+        if items:
+            body.append("<ul>" + "".join(items) + "</ul>")
+            items = []
+        if line.strip():
+            body.append(f"<p>{html.escape(line)}</p>")
+    if items:
+        body.append("<ul>" + "".join(items) + "</ul>")
+    for table in slide.get("tables") or []:
+        rows = [f"<tr>{''.join(f'<th>{html.escape(cell)}</th>' for cell in table[0])}</tr>"]
+        rows.extend(f"<tr>{''.join(f'<td>{html.escape(cell)}</td>' for cell in row)}</tr>" for row in table[1:])
+        body.append("<table>" + "".join(rows) + "</table>")
+
+    columns = []
+    if body:
+        columns.append('<div class="text">' + "".join(body) + "</div>")
+    if image_names:
+        columns.append('<div class="images">' + "".join(f'<img src="{html.escape(name)}" alt="">'
+                                                        for name in image_names) + "</div>")
+    logo = f'<img class="logo" src="{html.escape(logo_name)}" alt="">' if logo_name else ""
+    return (f'<section class="slide">{logo}<h1>{html.escape(slide.get("title") or "")}</h1>'
+            f'<div class="body">{"".join(columns)}</div></section>')
+
+def encode_narration_aac(source, target):
+    """Encode une narration (WAV du cache ou PCM en mémoire) en AAC (.m4a) pour le deck HTML"""
+    in_memory = isinstance(source, tuple)
+    cmd = [get_ffmpeg_binary(), '-y', '-loglevel', 'error',
+           *(pcm_input_args(source) if in_memory else ['-i', str(source)]),
+           '-c:a', ENCODING_SETTINGS["audio_codec"], '-b:a', HTML_AUDIO_BITRATE, '-movflags', '+faststart', str(target)]
+    result = subprocess.run(cmd, input=pcm_bytes(source) if in_memory else None, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg a échoué: {result.stderr.decode('utf-8', 'ignore').strip()}")
+    return target
+
+def export_html_deck(slides, timeline, deck_dir, title="Présentation"):
+    """Écrit le deck HTML : index.html, timeline.json, narrations AAC et images copiées (sans encodage vidéo)"""
+    import html
+    from concurrent.futures import ThreadPoolExecutor
+
+    deck_dir = Path(deck_dir)
+    asset_dir = deck_dir / "assets"
+    asset_dir.mkdir(parents=True, exist_ok=True)
+
+    # Narrations : un fichier par texte distinct (la clé du cache TTS identifie déjà le contenu)
+    audio_jobs = {}
+    audio_names = []
+    for i, slide in enumerate(slides):
+        source = slide.get("audio_path") or slide.get("audio_pcm")
+        if source is None:
+            audio_names.append(None)
+            continue
+        name = f"assets/{(slide.get('tts_key') or f'slide_{i:03d}')[:16]}.m4a"
+        audio_jobs.setdefault(name, source)
+        audio_names.append(name)
+
+    # Images et logo copiés tels quels, nommés par leur empreinte pour dédupliquer
+    def copy_asset(path):
+        path = Path(path)
+        name = f"assets/{hashlib.sha1(str(path.resolve()).encode('utf-8')).hexdigest()[:12]}{path.suffix.lower()}"
+        if not (deck_dir / name).exists():
+            shutil.copyfile(path, deck_dir / name)
+        return name
+
+    image_names = [[copy_asset(path) for path in slide.get("images") or []] for slide in slides]
+    logo_name = copy_asset(LOGO_PATH) if LOGO_PATH and Path(LOGO_PATH).exists() else None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(IMAGE_DECODE_WORKERS, len(audio_jobs) or 1))) as pool:
+        list(pool.map(lambda job: encode_narration_aac(job[1], deck_dir / job[0]), audio_jobs.items()))
+
+    entries = [{"index": entry["index"], "title": entry["title"], "start": round(entry["start"], 3),
+                "end": round(entry["end"], 3), "duration": round(entry["duration"], 3), "audio": audio}
+               for entry, audio in zip(timeline, audio_names)]
+    timeline_data = {"title": title, "duration": round(timeline[-1]["end"], 3) if timeline else 0,
+                     "slides": entries}
+    (deck_dir / "timeline.json").write_text(json.dumps(timeline_data, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    page = HTML_DECK_TEMPLATE.format(
+        title=html.escape(title),
+        slides="\n".join(slide_html(slide, names, logo_name) for slide, names in zip(slides, image_names)),
+        timeline=json.dumps(timeline_data, ensure_ascii=False).replace("</", "<\\/"),
+        bg=BG_COLOR, color=TEXT_COLOR, border=TABLE_BORDER, header=TABLE_HEADER_BG, row=TABLE_ROW_BG_1,
+        image_ratio=int(IMAGE_COLUMN_RATIO * 100), padding_ms=int(NARRATION_PADDING * 1000),
+    )
+    index_path = deck_dir / "index.html"
+    index_path.write_text(page, encoding='utf-8')
+    return index_path
+
+def create_enhanced_presentation(content, output_video_path=None, model_name="microsoft/phi-2", content_type="general",
+                                 tts_backend=None, report=None):
+    """Crée une présentation simple compatible avec l'interface PyQt5 ; les étapes sont mesurées dans report"""
+    from moviepy.audio.AudioClip import AudioArrayClip
+    from moviepy.video.compositing.concatenate import concatenate_videoclips
+    
+    ensure_paths()
     if output_video_path is None:
         output_path = OUTPUT_DIR / "presentation_fidele.mp4"
     else:
@@ -487,80 +2598,189 @@ def create_enhanced_presentation(content, output_video_path=None, model_name="mi
     # Créer le répertoire parent si nécessaire
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Chemin audio correspondant
-    audio_path = output_path.with_suffix('.wav')
+    # Rapport des étapes (temps, CPU, mémoire, images, octets), écrit à côté de la vidéo
+    report = report or RenderReport()
+    report.info.update({
+        "video": str(output_path),
+        "timestamp": datetime.now().isoformat(),
+        "renderer": RENDER_MODE,
+        "profile": ENCODING_SETTINGS["profile"],
+        "resolution": f"{WIDTH}x{HEIGHT}",
+        "fps": ENCODING_SETTINGS["fps"],
+        "success": False,
+    })
     
-    all_slides = []
-    full_narration = ""
+    # Cache des vidéos finales : une vidéo identique déjà produite est liée au nouveau chemin
+    cache_key = None
+    report.info["output_cache"] = "disabled"
+    if OUTPUT_CACHE_ENABLED and VIDEO_EXPORT and not HTML_EXPORT:
+        with report.stage("output_cache") as span:
+            cache_key = output_cache_key(content, content_type)
+            cached = OUTPUT_CACHE.get(cache_key)
+            if cached:
+                span["mode"] = reuse_cached_output(cached, output_path)
+                span["bytes"] = output_path.stat().st_size
+        report.info["output_cache"] = "hit" if cached else "miss"
+        report.info["output_cache_key"] = cache_key
+        if cached:
+            print(f"♻️ Vidéo identique trouvée dans le cache ({span['mode']}): {output_path}")
+            report.info["success"] = True
+            report_progress("done", 1.0, str(output_path))
+            save_render_report(report, output_path)
+            return str(output_path)
+    if output_path.exists() and output_path.stat().st_nlink > 1:
+        # Ne jamais réécrire sur place un fichier partagé avec le cache
+        output_path.unlink()
+    
+    slides = []
     
     # Introduction
-    intro = slide_clip("🎓 Présentation", "Introduction", duration=INTRO_DUR)
-    all_slides.append(intro)
-    full_narration += "Bienvenue dans cette présentation. "
+    slides.append({"title": "🎓 Présentation", "text": "Introduction", "duration": INTRO_DUR,
+                   "narration": "Bienvenue dans cette présentation."})
     
-    # Traitement du contenu
+    # Découpage du contenu en slides typés (une seule passe : pagination, titres, listes, tableaux, images)
+    if content_type in NARRATION_INTROS:
+        print(f"🎯 Narration adaptée au contenu {content_type}")
+    report_progress("slides", 0.02, "découpage du Markdown")
+    with report.stage("parse") as span:
+        slides.extend(iter_markdown_slides(content, SKIP_PAGE_NUMBERS, content_type))
+        span["bytes"] = len(content.encode('utf-8'))
+    with report.stage("images") as span:
+        prepare_slide_images(slides)
+        span["images"] = sum(len(slide.get("images") or []) for slide in slides)
+    if ANIMATE_TEXT:
+        for slide in slides:
+            slide["animate"] = bool(slide.get("text") or slide.get("tables"))
     if SKIP_PAGE_NUMBERS:
-        content = remove_page_numbers(content)
-    
-    # Diviser le contenu en sections
-    sections = content.split('\n\n')
-    
-    for i, section in enumerate(sections):
-        if section.strip():
-            lines = section.split('\n')
-            title = lines[0] if lines else f"Section {i+1}"
-            content_text = '\n'.join(lines[1:]) if len(lines) > 1 else section
-            
-            slide = slide_clip(title, content_text, duration=SLIDE_DUR)
-            all_slides.append(slide)
-            
-            # Narration
-            narration_text = re.sub(r'[#*]', '', section)
-            full_narration += narration_text + ". "
+        print("✅ Références de page supprimées - Mode lecture fluide activé")
     
     # Conclusion
-    outro = slide_clip("📘 Merci", "Conclusion", duration=OUTRO_DUR)
-    all_slides.append(outro)
-    full_narration += "Merci pour votre attention."
+    slides.append({"title": "📘 Merci", "text": "Conclusion", "duration": OUTRO_DUR,
+                   "narration": "Merci pour votre attention."})
+    # Fondus liés une fois la liste complète : le dernier slide de contenu fond aussi vers la conclusion
+    if TRANSITIONS_ENABLED:
+        link_slide_transitions(slides)
     
-    # Génération audio
-    print("🔊 Génération de la narration...")
-    engine.save_to_file(full_narration, str(audio_path))
-    engine.runAndWait()
-    time.sleep(1)
+    # Génération audio : une narration par slide, la durée du slide suit celle de son audio
+    print(f"🔊 Génération de la narration ({len(slides)} slides)...")
+    report_progress("tts", 0.1, f"{len(slides)} slides")
+    with report.stage("tts") as span:
+        synthesize_slide_narrations(slides, backend=tts_backend)
+        narrated = [slide for slide in slides if slide.get("audio_path") or slide.get("audio_pcm") is not None]
+        span["narrations"] = len(narrated)
+        span["audio_s"] = round(sum(slide.get("audio_duration", 0) for slide in narrated), 2)
+        span["bytes"] = sum(Path(slide["audio_path"]).stat().st_size if slide.get("audio_path")
+                            else slide["audio_pcm"][0].nbytes for slide in narrated)
+    timeline = build_timeline(slides)
+    report.info.update(slides=len(slides), video_s=round(timeline[-1]["end"], 2))
     
-    if not audio_path.exists():
+    # Deck HTML : construit sur les mêmes slides et narrations, sans encodage vidéo
+    if HTML_EXPORT:
+        deck_dir = output_path.parent / f"{output_path.stem}_html"
+        deck_title = next((s["title"] for s in slides[1:-1] if s.get("title")), output_path.stem)
+        print(f"🌐 Export HTML: {deck_dir}")
+        index_path = None
+        with report.stage("html") as span:
+            try:
+                index_path = export_html_deck(slides, timeline, deck_dir, deck_title)
+                span["bytes"] = sum(f.stat().st_size for f in deck_dir.rglob("*") if f.is_file())
+                report.info["html"] = str(index_path)
+            except Exception as e:
+                print(f"⚠️ Deck HTML non généré: {e}")
+                span["error"] = str(e)
+        if index_path:
+            print(f"🌐 Deck HTML créé en {span['wall_s']:.1f} s: {index_path}")
+        if not VIDEO_EXPORT:
+            report.info["success"] = index_path is not None
+            save_render_report(report, output_path)
+            return str(index_path) if index_path else False
+    
+    # Piste de narration en mémoire, encodée une seule fois en AAC au multiplexage
+    with report.stage("narration_track") as span:
+        narration = assemble_narration_track(timeline)
+        span["bytes"] = narration[0].nbytes if narration else 0
+    for slide in slides:
+        slide.pop("audio_pcm", None)  # Inutile aux processus d'encodage
+    if narration is None:
         print("❌ Échec de la génération audio")
+        save_render_report(report, output_path)
         return False
+    print(f"⏱️ Durée totale: {timeline[-1]['end']:.1f} s pour {len(timeline)} slides")
+    report_progress("render", 0.4, f"{timeline[-1]['end']:.1f} s de vidéo")
     
-    # Création vidéo
-    print("🎬 Création de la vidéo...")
-    final_clip = concatenate_videoclips(all_slides)
-    
-    audio = AudioFileClip(str(audio_path))
-    if audio.duration > final_clip.duration:
-        audio = audio.subclip(0, final_clip.duration)
-    final_clip = final_clip.set_audio(audio)
+    final_clip = None
+    audio = None
     
     print(f"💾 Sauvegarde: {output_path}")
     print(f"🎥 Génération en cours avec le modèle {model_name}...")
     
     try:
-        final_clip.write_videofile(
-            str(output_path),
-            fps=24,
-            codec="libx264",
-            audio_codec="aac",
-            preset="faster",
-            threads=4,
-            verbose=False,  # Réduire la verbosité pour l'interface
-            logger=None     # Désactiver le logger moviepy
-        )
+        with report.stage("render") as span:
+            if RENDER_MODE == "segments":
+                # Segments encodés en parallèle puis concaténés, narration multiplexée à la fin
+                print("🎬 Création de la vidéo (segments parallèles)...")
+                render_segments_parallel(slides, output_path, narration, stats=span)
+            elif RENDER_MODE == "stream":
+                # Images envoyées slide par slide à ffmpeg, sans graphe de clips en mémoire
+                print("🎬 Création de la vidéo (flux vers ffmpeg)...")
+                render_slides_streaming(slides, output_path, narration, stats=span)
+            else:
+                # Création vidéo
+                print("🎬 Création de la vidéo...")
+                all_slides = [slide_clip(s["title"], s["text"], s.get("images"), s.get("tables"), duration=s["duration"],
+                                         animate_text=s.get("animate", False),
+                                         transition_to=s.get("transition_to"))
+                              for s in slides]
+                final_clip = concatenate_videoclips(all_slides)
+            
+                # AudioArrayClip (MoviePy 1.0) produit toujours 2 canaux par lot : piste mono dupliquée
+                pcm, rate = narration
+                samples = pcm.astype(np.float32) / 32768.0
+                if samples.shape[1] == 1:
+                    samples = np.repeat(samples, 2, axis=1)
+                audio = AudioArrayClip(samples, fps=rate)
+                final_clip = final_clip.set_audio(audio)
+            
+                final_clip.write_videofile(
+                    str(output_path),
+                    fps=ENCODING_SETTINGS["fps"],
+                    codec=ENCODING_SETTINGS["codec"],
+                    audio_codec=ENCODING_SETTINGS["audio_codec"],
+                    preset=ENCODING_SETTINGS["preset"],
+                    ffmpeg_params=video_codec_params(),
+                    threads=4,
+                    verbose=False,  # Réduire la verbosité pour l'interface
+                    logger=None     # Désactiver le logger moviepy
+                )
+                span["frames"] = int(round(final_clip.duration * ENCODING_SETTINGS["fps"]))
+            span["bytes"] = output_path.stat().st_size if output_path.exists() else 0
+        
+        # Incrustation de l'avatar : une passe ffmpeg sur la vidéo finie
+        if AVATAR_PATH and output_path.exists():
+            print(f"👤 Incrustation de l'avatar ({AVATAR_CORNER})...")
+            report_progress("avatar", 0.9)
+            with report.stage("avatar") as span:
+                try:
+                    overlay_avatar(output_path, AVATAR_PATH)
+                    span["bytes"] = output_path.stat().st_size
+                except Exception as e:
+                    print(f"⚠️ Avatar non incrusté: {e}")
+                    span["error"] = str(e)
+            if "error" not in span:
+                print(f"👤 Avatar incrusté en {span['wall_s']:.1f} s")
         
         # Vérifier que le fichier a été créé
         if output_path.exists() and output_path.stat().st_size > 0:
             print(f"✅ Vidéo créée avec succès: {output_path}")
             print(f"📁 Taille du fichier: {output_path.stat().st_size / (1024*1024):.1f} MB")
+            report.info["success"] = True
+            if cache_key:
+                try:
+                    OUTPUT_CACHE.put_link(cache_key, output_path)
+                    OUTPUT_CACHE.evict(keep=[OUTPUT_CACHE.path_for(cache_key)])
+                except OSError as e:
+                    print(f"⚠️ Vidéo non ajoutée au cache: {e}")
+            report_progress("done", 1.0, str(output_path))
             return str(output_path)
         else:
             print("❌ Erreur: Le fichier vidéo n'a pas été créé correctement")
@@ -572,21 +2792,240 @@ def create_enhanced_presentation(content, output_video_path=None, model_name="mi
     finally:
         # Nettoyer les ressources
         try:
-            final_clip.close()
-            audio.close()
+            if final_clip is not None:
+                final_clip.close()
+            if audio is not None:
+                audio.close()
         except:
             pass
+        save_render_report(report, output_path)
+
+def reuse_cached_output(cached_path, output_path):
+    """Place la vidéo du cache au chemin demandé : lien physique, copie en repli"""
+    output_path = Path(output_path)
+    if output_path.exists():
+        if os.path.samefile(cached_path, output_path):
+            return "link"
+        output_path.unlink()
+    return link_or_copy(cached_path, output_path)
+
+def save_render_report(report, output_path):
+    """Écrit <vidéo>.report.json et affiche la durée de chaque étape"""
+    try:
+        path = report.save(Path(output_path).with_suffix('.report.json'))
+        print(f"⏱️ Étapes: {report.summary()}")
+        print(f"📝 Rapport de rendu: {path}")
+    except OSError as e:
+        print(f"⚠️ Rapport de rendu non écrit: {e}")
+
+def configure_from_args(args):
+    """Applique les options de rendu de la ligne de commande aux paramètres globaux"""
+    global DIRECT_READING_MODE, SKIP_PAGE_NUMBERS, STATIC_SLIDES, RENDER_MODE, SEGMENT_WORKERS, SLIDES_PER_SEGMENT
+    global TEXT_RENDERER, TTS_CACHE_ENABLED, TTS_CACHE, TTS_WORKERS, TTS_BACKEND_NAME
+    global SEGMENT_CACHE_ENABLED, SEGMENT_CACHE, ANIMATE_TEXT, DUMP_ANIMATION_FRAMES, TRANSITIONS_ENABLED
+    global AVATAR_CORNER, HTML_EXPORT, VIDEO_EXPORT, OUTPUT_CACHE_ENABLED, OUTPUT_CACHE
+    
+    SKIP_PAGE_NUMBERS = args.no_page_numbers or args.direct_reading  # Support des deux arguments
+    DIRECT_READING_MODE = args.no_page_numbers or args.direct_reading
+    STATIC_SLIDES = not args.dynamic_slides
+    ANIMATE_TEXT = args.animate_text
+    TRANSITIONS_ENABLED = not args.no_transitions
+    DUMP_ANIMATION_FRAMES = args.dump_animation_frames
+    TEXT_RENDERER = args.text_renderer
+    TTS_CACHE_ENABLED = not args.no_tts_cache
+    TTS_WORKERS = max(1, args.tts_workers)
+    TTS_BACKEND_NAME = args.tts_backend
+    SEGMENT_CACHE_ENABLED = not args.no_segment_cache
+    OUTPUT_CACHE_ENABLED = not args.no_output_cache
+    # Toujours réaffecté : un processus batch ou de service enchaîne des travaux aux options différentes
+    cache_root = Path(args.cache_dir) if args.cache_dir else CACHE_ROOT
+    if TTS_CACHE.cache_dir != cache_root / "tts":
+        TTS_CACHE = TTSCache(cache_root / "tts")
+    if SEGMENT_CACHE.cache_dir != cache_root / "segments":
+        SEGMENT_CACHE = SegmentCache(cache_root / "segments")
+    if OUTPUT_CACHE.cache_dir != cache_root / "outputs":
+        OUTPUT_CACHE = OutputCache(cache_root / "outputs")
+    RENDER_MODE = args.renderer
+    SEGMENT_WORKERS = args.workers or (os.cpu_count() or 1)
+    SLIDES_PER_SEGMENT = max(1, args.slides_per_segment)
+    AVATAR_CORNER = args.avatar_corner
+    HTML_EXPORT = args.html or args.html_only
+    VIDEO_EXPORT = not args.html_only
+    apply_encoding_profile(args.quality, args.resolution, args.fps)
+
+BATCH_ARGS = None
+BATCH_TTS_BACKEND = None
+
+def load_batch_manifest(source):
+    """Liste les fichiers Markdown d'un batch : dossier, liste texte (un chemin par ligne, # = commentaire) ou liste JSON"""
+    source = Path(source)
+    if source.is_dir():
+        return sorted(path for path in source.glob("*.md") if path.is_file())
+    
+    text = source.read_text(encoding='utf-8')
+    if source.suffix.lower() == ".json":
+        entries = json.loads(text)
+    else:
+        entries = [line.strip() for line in text.splitlines()]
+        entries = [line for line in entries if line and not line.startswith("#")]
+    # Les chemins relatifs sont résolus par rapport à la liste elle-même
+    return [path if path.is_absolute() else source.parent / path for path in map(Path, entries)]
+
+def batch_output_names(markdown_files):
+    """Nom de vidéo par fichier (<nom>.mp4), suffixé quand deux fichiers portent le même nom"""
+    names = []
+    seen = {}
+    for path in markdown_files:
+        stem = Path(path).stem
+        seen[stem] = seen.get(stem, 0) + 1
+        names.append(f"{stem}.mp4" if seen[stem] == 1 else f"{stem}_{seen[stem]}.mp4")
+    return names
+
+def render_markdown_file(markdown_file, args, output_filename=None, tts_backend=None):
+    """Rend un fichier Markdown avec les paramètres globaux courants ; résultat et durée dans un dictionnaire"""
+    global INPUT_MD, BASE_DIR, OUTPUT_DIR, ANIMATION_DIR, LOGO_PATH
+    
+    start_time = time.time()
+    result = {"file": str(markdown_file), "output": None, "success": False, "content_type": None}
+    report = RenderReport()
+    try:
+        INPUT_MD, BASE_DIR, OUTPUT_DIR, ANIMATION_DIR, LOGO_PATH, output_video_path = setup_paths(
+            markdown_file, args.output_dir or "output", output_filename)
+        if not Path(markdown_file).exists():
+            raise FileNotFoundError(f"Fichier non trouvé: {markdown_file}")
+        
+        with report.stage("analysis"):
+            content_analysis = analyze_document_content(markdown_file)
+        result["content_type"] = content_analysis.get("content_type", "general")
+        result["content_analysis"] = content_analysis
+        with open(markdown_file, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        if getattr(args, 'enhance_ai', False):
+            content = enhance_content_with_ai(content, args.model)
         
-        # Nettoyer le fichier audio temporaire
+        video = create_enhanced_presentation(content, str(output_video_path), args.model,
+                                             result["content_type"], tts_backend=tts_backend, report=report)
+        result["success"] = bool(video)
+        result["output"] = video if isinstance(video, str) else None
+    except Exception as e:
+        print(f"❌ Erreur sur {markdown_file}: {e}")
+        result["error"] = str(e)
+    result["seconds"] = round(time.time() - start_time, 2)
+    result["report"] = report.to_dict()
+    return result
+
+def _init_batch_worker(args, avatar_path):
+    """Configure un processus du batch : paramètres de rendu et moteur TTS gardés pour tous ses fichiers"""
+    global AVATAR_PATH, BATCH_ARGS, BATCH_TTS_BACKEND
+    configure_from_args(args)
+    AVATAR_PATH = avatar_path
+    BATCH_ARGS = args
+    try:
+        BATCH_TTS_BACKEND = get_tts_backend()
+    except Exception as e:
+        print(f"⚠️ Moteur TTS indisponible ({e}), un moteur sera créé par fichier")
+        BATCH_TTS_BACKEND = None
+
+def _batch_worker_render(markdown_file, output_filename):
+    """Rend un fichier du batch dans un processus du pool"""
+    return render_markdown_file(markdown_file, BATCH_ARGS, output_filename, BATCH_TTS_BACKEND)
+
+def run_batch(args):
+    """Rend tous les fichiers d'un batch dans des processus gardés chauds (imports, polices, caches, moteur TTS)"""
+    global AVATAR_PATH
+    
+    try:
+        markdown_files = load_batch_manifest(args.batch)
+    except (OSError, ValueError) as e:
+        print(f"❌ Liste de fichiers illisible ({args.batch}): {e}")
+        return False
+    if not markdown_files:
+        print(f"❌ Aucun fichier Markdown trouvé dans {args.batch}")
+        return False
+    
+    workers = max(1, min(args.batch_workers, len(markdown_files)))
+    output_names = batch_output_names(markdown_files)
+    print(f"📦 Batch: {len(markdown_files)} fichier(s) sur {workers} processus")
+    
+    AVATAR_PATH = None if args.no_avatar else configure_avatar(args.avatar_path)
+    learning_data = load_learning_history()
+    start_time = time.time()
+    results = []
+    
+    def record(result):
+        # L'historique est écrit par le seul processus principal, dans l'ordre d'arrivée
+        results.append(result)
+        status = "✅" if result["success"] else "❌"
+        print(f"{status} [{len(results)}/{len(markdown_files)}] {result['file']} en {result['seconds']:.1f} s")
+        job_args = argparse.Namespace(**{**vars(args), "markdown_file": result["file"]})
+        if Path(result["file"]).exists():
+            save_processing_record_compatible(job_args, result.get("content_analysis", {}), result["success"],
+                                              result["seconds"], learning_data, result["output"],
+                                              result.get("report"))
+    
+    if workers == 1:
+        tts_backend = None
         try:
-            if audio_path.exists():
-                audio_path.unlink()
-        except:
-            pass
+            tts_backend = get_tts_backend()
+        except Exception as e:
+            print(f"⚠️ Moteur TTS indisponible ({e}), un moteur sera créé par fichier")
+        try:
+            for markdown_file, output_name in zip(markdown_files, output_names):
+                print(f"\n📄 {markdown_file}")
+                record(render_markdown_file(markdown_file, args, output_name, tts_backend))
+        finally:
+            if tts_backend is not None:
+                tts_backend.close()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(args, AVATAR_PATH)) as pool:
+            futures = [pool.submit(_batch_worker_render, markdown_file, output_name)
+                       for markdown_file, output_name in zip(markdown_files, output_names)]
+            for future in futures:
+                record(future.result())
+    
+    total_time = time.time() - start_time
+    succeeded = sum(1 for result in results if result["success"])
+    
+    # Récapitulatif : console puis batch_summary.json dans le dossier de sortie
+    print("\n" + "=" * 60)
+    print(f"📦 Batch terminé: {succeeded}/{len(results)} vidéo(s) en {total_time:.1f} s")
+    for result in results:
+        status = "✅" if result["success"] else "❌"
+        print(f"   {status} {result['seconds']:>7.1f} s  {Path(result['file']).name} -> {result['output'] or result.get('error', 'échec')}")
+    summary = {
+        "timestamp": datetime.now().isoformat(),
+        "source": str(args.batch),
+        "workers": workers,
+        "total_seconds": round(total_time, 2),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "files": [{**{key: value for key, value in result.items() if key not in ("content_analysis", "report")},
+                   "output_cache": result["report"].get("output_cache"),
+                   "stages": {span["stage"]: span["wall_s"] for span in result["report"]["stages"]}}
+                  for result in results],
+    }
+    output_dir = Path(args.output_dir or "output")
+    output_dir = output_dir if output_dir.is_absolute() else Path.cwd() / output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = output_dir / "batch_summary.json"
+    summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"📝 Récapitulatif: {summary_path}")
+    if TTS_CACHE_ENABLED and workers == 1:  # Compteurs propres à chaque processus
+        tts_stats = TTS_CACHE.stats()
+        print(f"🗃️ Cache TTS: {tts_stats['hits']} hit(s), {tts_stats['misses']} miss(es), "
+              f"{tts_stats['evictions']} éviction(s)")
+    reused = sum(1 for result in results if result["report"].get("output_cache") == "hit")
+    if reused:
+        print(f"♻️ Vidéos reprises du cache: {reused}/{len(results)}")
+    print("=" * 60)
+    
+    return succeeded == len(results)
 
 def main():
     """Fonction principale - Compatible avec le script de référence"""
-    global DIRECT_READING_MODE, SKIP_PAGE_NUMBERS, INPUT_MD, BASE_DIR, OUTPUT_DIR, ANIMATION_DIR, LOGO_PATH
+    global AVATAR_PATH
+    global INPUT_MD, BASE_DIR, OUTPUT_DIR, ANIMATION_DIR, LOGO_PATH
     
     try:
         print("🚀 Générateur de Vidéos Éducatives - Deep Learning Enhanced")
@@ -602,8 +3041,11 @@ def main():
         logger = setup_logging(getattr(args, 'verbose', False))
         
         # Configuration des variables globales - COMPATIBILITÉ TOTALE
-        SKIP_PAGE_NUMBERS = args.no_page_numbers or args.direct_reading  # Support des deux arguments
-        DIRECT_READING_MODE = args.no_page_numbers or args.direct_reading
+        configure_from_args(args)
+        
+        # Mode batch : plusieurs fichiers dans le même processus
+        if args.batch:
+            return run_batch(args)
         
         # Déterminer le chemin de sortie final
         output_filename = args.output
@@ -621,7 +3063,7 @@ def main():
         print(f"📄 Fichier d'entrée: {args.markdown_file}")
         print(f"🤖 Modèle IA: {args.model}")
         print(f"📖 Mode lecture: {'Directe (fluide)' if (args.no_page_numbers or args.direct_reading) else 'Standard (avec pages)'}")
-        print(f"🎬 Format: {'HTML + Vidéo' if args.html else 'Vidéo uniquement'}")
+        print(f"🎬 Format: {'HTML uniquement' if args.html_only else 'HTML + Vidéo' if args.html else 'Vidéo uniquement'}")
         print(f"👤 Avatar: {'Désactivé' if args.no_avatar else 'Activé'}")
         print("-" * 60)
         
@@ -632,7 +3074,9 @@ def main():
         
         # Analyser le document avec IA
         print("🧠 Analyse IA du document en cours...")
-        content_analysis = analyze_document_content(args.markdown_file)
+        report = RenderReport()
+        with report.stage("analysis"):
+            content_analysis = analyze_document_content(args.markdown_file)
         print(f"📊 Type de contenu: {content_analysis['content_type']}")
         print(f"📈 Complexité: {content_analysis['complexity']}")
         print(f"📝 Longueur estimée: {content_analysis['estimated_length']} mots")
@@ -643,6 +3087,7 @@ def main():
             avatar_path = configure_avatar(args.avatar_path)
         else:
             print("👤 L'avatar a été désactivé avec --no-avatar")
+        AVATAR_PATH = avatar_path
         
         # Charger l'historique d'apprentissage
         learning_data = load_learning_history()
@@ -668,16 +3113,13 @@ def main():
         with open(args.markdown_file, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
         
-        # Appliquer le mode lecture directe si demandé
+        # Le mode lecture directe et l'adaptation au type de contenu sont appliqués
+        # pendant le découpage en slides (iter_markdown_slides)
         if args.no_page_numbers or args.direct_reading:
             print("📖 Application du mode lecture directe...")
-            content = remove_page_numbers(content)
         else:
             print("📄 Conservation du mode standard avec pagination")
         
-        # Optimiser selon le type de contenu
-        content = optimize_content_for_type(content, content_analysis)
-        
         # Améliorer avec IA si demandé
         if getattr(args, 'enhance_ai', False):
             print("🤖 Amélioration du contenu avec IA...")
@@ -687,7 +3129,8 @@ def main():
         print("🎦 Génération de la vidéo...")
         print(f"💾 Fichier de sortie prévu: {OUTPUT_VIDEO_PATH}")
         
-        result = create_enhanced_presentation(content, str(OUTPUT_VIDEO_PATH), args.model)
+        result = create_enhanced_presentation(content, str(OUTPUT_VIDEO_PATH), args.model,
+                                              content_analysis.get("content_type", "general"), report=report)
         
         # Calculer le temps de traitement
         processing_time = time.time() - start_time
@@ -697,7 +3140,8 @@ def main():
         final_output_path = result if isinstance(result, str) else (str(OUTPUT_VIDEO_PATH) if success else None)
         
         # Enregistrer dans l'historique
-        save_processing_record_compatible(args, content_analysis, success, processing_time, learning_data, final_output_path)
+        save_processing_record_compatible(args, content_analysis, success, processing_time, learning_data, final_output_path,
+                                          report.to_dict())
         
         # Afficher les résultats
         print("\n" + "=" * 60)
@@ -708,6 +3152,16 @@ def main():
             print(f"🎬 Modèle utilisé: {args.model}")
         else:
             print("❌ Échec de la génération")
+        peak_rss, peak_children_rss = get_peak_rss()
+        if peak_rss:
+            children = f" (sous-processus: {peak_children_rss / (1024*1024):.0f} Mo)" if peak_children_rss else ""
+            print(f"📈 Pic mémoire: {peak_rss / (1024*1024):.0f} Mo{children}")
+        if TTS_CACHE_ENABLED:
+            tts_stats = TTS_CACHE.stats()
+            print(f"🗃️ Cache TTS: {tts_stats['hits']} hit(s), {tts_stats['misses']} miss(es), "
+                  f"{tts_stats['evictions']} éviction(s)")
+        if report.info.get("output_cache") == "hit":
+            print("♻️ Vidéo reprise du cache (aucun rendu)")
         
         print("=" * 60)
         
@@ -722,7 +3176,8 @@ def main():
         traceback.print_exc()
         return False
 
-def save_processing_record_compatible(args, content_analysis, success, processing_time, learning_data, final_output_path=None):
+def save_processing_record_compatible(args, content_analysis, success, processing_time, learning_data, final_output_path=None,
+                                      render_report=None):
     """Sauvegarde compatible avec le script principal"""
     output_path = final_output_path if final_output_path else None
     
@@ -738,12 +3193,17 @@ def save_processing_record_compatible(args, content_analysis, success, processin
         'content_analysis': content_analysis,
         'options_used': {
             'no_page_numbers': args.no_page_numbers or args.direct_reading,  # Support des deux
-            'html_mode': args.html,
+            'html_mode': args.html or args.html_only,
             'no_avatar': args.no_avatar,
             'custom_output': args.output is not None
         },
         'success': success
     }
+    if render_report:
+        # Étapes du rendu (temps, CPU, mémoire, images, octets) pour suivre les régressions
+        processing_record['render_report'] = {key: render_report[key]
+                                              for key in ('renderer', 'profile', 'output_cache', 'total', 'stages')
+                                              if key in render_report}
     
     # Mettre à jour l'historique
     if 'processed_files' not in learning_data:
@@ -779,7 +3239,6 @@ def save_processing_record_compatible(args, content_analysis, success, processin
 
 if __name__ == "__main__":
     # Configuration de l'encodage pour la compatibilité avec l'interface PyQt5
-    import sys
     import codecs
     
     # Forcer l'encodage UTF-8 pour la sortie